@@ -17,3 +17,7 @@ print("Red   Light level: "  , apds9960.als.redLightLevel)
 print("Green Light level: ", apds9960.als.greenLightLevel)
 print("Blue  Light level: " , apds9960.als.blueLightLevel)
 
+
+# All four channels from the same integration cycle in one I2C transaction
+clear,red,green,blue = apds9960.als.readRGBC()
+print("RGBC (single read): ", clear, red, green, blue)
@@ -1,5 +1,4 @@
 import machine
-from time import sleep_ms
 from uPy_APDS9960.apds9960LITE import APDS9960LITE
 
 #Init I2C Buss
@@ -9,16 +8,15 @@ apds9960=APDS9960LITE(i2c)         # Enable sensor
 apds9960.als.enableSensor()   # Enable Light sensor
 apds9960.als.eLightGain=3          # x64 gain
 apds9960.als.setInterruptThreshold(high=100,low=0,persistance=7)
-apds9960.als.enableInterrupt(True)     # Enable interrupt
-apds9960.als.clearInterrupt()          # Clear interrupt
-sleep_ms(50)
 
 IrqThPin=machine.Pin(0, machine.Pin.IN ,machine.Pin.PULL_UP)
-sleep_ms(50)
+apds9960.attachInterrupt(IrqThPin)     # Read light level and clear interrupt on IRQ
+apds9960.als.enableInterrupt(True)     # Enable interrupt (after attaching, the first edge is seen)
 
 while True:
-    sleep_ms(50)
-
-    if(IrqThPin.value()==0):
-        print("Ambient light level:", apds9960.als.ambientLightLevel )
-        apds9960.als.clearInterrupt()
+    sample=apds9960.pollInterrupt()    # Also services an interrupt the pin IRQ missed
+    if sample is None:
+        machine.idle()                 # Wait for the next interrupt
+        continue
+    ticks,channel,level=sample
+    print("Ambient light level:", level )
@@ -0,0 +1,19 @@
+import machine
+import uasyncio as asyncio
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+
+# Two sensors on separate I2C busses (RP2040)
+i2c0 = machine.I2C(0,scl=machine.Pin(17), sda=machine.Pin(16))
+i2c1 = machine.I2C(1,scl=machine.Pin(15), sda=machine.Pin(14))
+
+async def main():
+    # Both sensors power up concurrently (50 ms in total, not 50 ms per sensor)
+    left,right = await asyncio.gather(APDS9960LITE.create(i2c0),
+                                      APDS9960LITE.create(i2c1))
+    left.prox.enableSensor()
+    right.prox.enableSensor()
+    while True:
+        await asyncio.sleep_ms(25)
+        print("proximity:", left.prox.proximityLevel, right.prox.proximityLevel)
+
+asyncio.run(main())
@@ -0,0 +1,27 @@
+import machine
+import uasyncio as asyncio
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+
+i2c =  machine.I2C(scl=machine.Pin(5), sda=machine.Pin(4))
+
+async def proximity(apds9960):
+    async for ticks,channel,level in apds9960.prox.stream(rate_hz=20):
+        print("proximity:", level)
+
+async def colour(apds9960):
+    async for ticks,channel,c,r,g,b in apds9960.als.stream(rate_hz=2,rgbc=True):
+        print("clear:", c, "red:", r, "green:", g, "blue:", b)
+
+async def blink():
+    led=machine.Pin(2, machine.Pin.OUT)
+    while True:                       # Keeps running while the sensors are streamed
+        led.value(not led.value())
+        await asyncio.sleep_ms(500)
+
+async def main():
+    apds9960=await APDS9960LITE.create(i2c)
+    apds9960.prox.enableSensor()
+    apds9960.als.enableSensor()
+    await asyncio.gather(proximity(apds9960),colour(apds9960),blink())
+
+asyncio.run(main())
@@ -0,0 +1,31 @@
+# Measures heap allocations per register read
+# Expected output on a port with readfrom_mem_into: 0 bytes per read
+import gc
+import machine
+from time import sleep_ms
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+
+i2c =  machine.I2C(scl=machine.Pin(5), sda=machine.Pin(4))
+
+apds9960=APDS9960LITE(i2c)
+apds9960.prox.enableSensor()
+apds9960.als.enableSensor()
+sleep_ms(50)
+
+READS=1000
+
+def measure(name,read):
+    read()                      # warm up (first call may allocate)
+    gc.collect()
+    gc.disable()
+    before=gc.mem_alloc()
+    for i in range(READS):
+        read()
+    used=gc.mem_alloc()-before
+    gc.enable()
+    print(name,":",used,"bytes allocated for",READS,"reads (",used//READS,"bytes per read )")
+
+prox=apds9960.prox
+als=apds9960.als
+measure("proximityLevel   ",lambda: prox.proximityLevel)
+measure("ambientLightLevel",lambda: als.ambientLightLevel)
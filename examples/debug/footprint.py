@@ -0,0 +1,53 @@
+# Measures the import time and heap use of the driver and of each engine
+# Compare the source modules with the build of tools/build_mpy.py (copy build/uPy_APDS9960 to the board)
+# The engines (prox, als, gesture) are created on first access, unused engines take no RAM
+# The optional features (gesture, light, calibration, i2cstats, samplering) are modules imported on first use
+import gc
+import machine
+from time import ticks_us, ticks_diff
+
+i2c =  machine.I2C(scl=machine.Pin(5), sda=machine.Pin(4))
+
+def measure(name,func):
+    gc.collect()
+    free=gc.mem_free()
+    t=ticks_us()
+    result=func()
+    us=ticks_diff(ticks_us(),t)
+    gc.collect()
+    print("%-28s %7d us %7d bytes" % (name,us,free-gc.mem_free()))
+    return result
+
+def importDriver():
+    import uPy_APDS9960.apds9960LITE
+    return uPy_APDS9960.apds9960LITE
+
+def importGesture():
+    import uPy_APDS9960.gesture
+
+def importLight():
+    import uPy_APDS9960.light
+
+def importCalibration():
+    import uPy_APDS9960.calibration
+
+def importSampleRing():
+    import uPy_APDS9960.samplering
+
+def importStats():
+    import uPy_APDS9960.i2cstats
+
+print("%-28s %10s %13s" % ("step","time","heap"))
+driver=measure("import apds9960LITE",importDriver)
+apds9960=measure("APDS9960LITE(i2c)",lambda: driver.APDS9960LITE(i2c,powerUp=False))
+measure("first apds9960.prox",lambda: apds9960.prox)
+measure("first apds9960.als",lambda: apds9960.als)
+measure("import gesture",importGesture)
+measure("first apds9960.gesture",lambda: apds9960.gesture)
+measure("import light",importLight)
+measure("als.enableAutoRange()",apds9960.als.enableAutoRange)
+measure("import calibration",importCalibration)
+measure("import samplering",importSampleRing)
+measure("import i2cstats",importStats)
+measure("enableStats()",apds9960.enableStats)
+print("driver loaded from",driver.__file__ if hasattr(driver,'__file__') else "frozen module")
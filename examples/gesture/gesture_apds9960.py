@@ -0,0 +1,25 @@
+import machine
+from time import sleep_ms
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+
+GESTURES = ("none","up","down","left","right","near","far")
+
+i2c =  machine.I2C(scl=machine.Pin(5), sda=machine.Pin(4))
+
+apds9960=APDS9960LITE(i2c,cache=True)
+apds9960.gesture.eGestureGain=2          # x4 gain
+apds9960.gesture.setThreshold(enter=40,exit=30,eFifoThreshold=1) # IRQ at 4 datasets
+apds9960.gesture.enableInterrupt()
+apds9960.gesture.enableSensor()
+
+IrqPin=machine.Pin(0, machine.Pin.IN ,machine.Pin.PULL_UP)
+
+while True:
+    sleep_ms(10)
+
+    # FIFO level reached (GINT), the IRQ is released when the FIFO is drained.
+    # The last datasets of a gesture may stay below the FIFO level, poll until the gesture is returned
+    if(IrqPin.value()==0 or apds9960.gesture.active):
+        gesture=apds9960.gesture.readGesture()   # One burst read drains the FIFO
+        if gesture:
+            print("gesture:", GESTURES[gesture])
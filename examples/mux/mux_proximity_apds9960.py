@@ -0,0 +1,23 @@
+import machine
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+from uPy_APDS9960.busmanager import TCA9548A, BusManager, DEADLINE
+
+#Init I2C Buss on RP2040
+i2c =  machine.I2C(0,scl=machine.Pin(17), sda=machine.Pin(16))
+
+mux = TCA9548A(i2c)                 # TCA9548A at address 0x70
+manager = BusManager(DEADLINE)      # Most overdue read first
+
+# APDS9960 sensors on mux channel 0 .. 3
+for ch in range(4):
+    bus = mux.channel(ch)
+    apds9960 = APDS9960LITE(bus)
+    apds9960.prox.enableSensor()
+    apds9960.als.enableSensor()
+    manager.add(lambda s=apds9960: s.prox.proximityLevel, period_ms=25, bus=bus)
+    manager.add(lambda s=apds9960: s.als.ambientLightLevel, period_ms=200, bus=bus)
+
+while True:
+    for id,value in manager.poll():
+        print("sensor", id//2, "light" if id&1 else "proximity", value)
+    manager.idle()
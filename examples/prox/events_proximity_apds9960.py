@@ -0,0 +1,20 @@
+import machine
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+from uPy_APDS9960.events import ProximityEvents, EVENT_ENTER, EVENT_LEAVE, EVENT_HOVER
+
+#Init I2C Buss on RP2040
+i2c =  machine.I2C(0,scl=machine.Pin(17), sda=machine.Pin(16))
+
+apds9960=APDS9960LITE(i2c)      # Enable sensor
+apds9960.prox.enableSensor()    # Enable Proximit sensing
+
+# INT pin of the APDS9960 connected to GPIO 0, the bus is only used on enter / leave
+events=ProximityEvents(apds9960, machine.Pin(0, machine.Pin.IN ,machine.Pin.PULL_UP),
+                       enter=50, leave=30, hover_ms=1000)
+
+names={EVENT_ENTER:"enter", EVENT_LEAVE:"leave", EVENT_HOVER:"hover"}
+while True:
+    event=events.pop()          # (ticks_us, event, proximity) or None
+    if event:
+        print(names[event[1]], "proximity:", event[2])
+    machine.idle()
@@ -0,0 +1,19 @@
+import machine
+from uPy_APDS9960.apds9960LITE import APDS9960LITE
+from uPy_APDS9960.filters import poll, median, ema, debounce
+
+#Init I2C Buss on RP2040
+i2c =  machine.I2C(0,scl=machine.Pin(17), sda=machine.Pin(16))
+
+apds9960=APDS9960LITE(i2c)      # Enable sensor
+apds9960.prox.enableSensor()    # Enable Proximit sensing
+
+# Read every 25 ms, remove spikes (median of 5) and smooth (alpha 1/4)
+level=ema(median(poll(lambda: apds9960.prox.proximityLevel, 25), 5), 2)
+
+# Near when above 40 for 3 samples, far when below 30 for 3 samples
+last=False
+for near in debounce(level, threshold=40, count=3, hysteresis=10):
+    if near!=last:
+        print("near" if near else "far")
+        last=near
@@ -1,5 +1,4 @@
 import machine
-from time import sleep_ms
 from uPy_APDS9960.apds9960LITE import APDS9960LITE
 
 # Proximity Gain (PGAIN) values
@@ -23,15 +22,15 @@ apds9960.prox.eProximityGain=APDS9960_PGAIN_8X
 
 apds9960.prox.enableSensor()
 apds9960.prox.setInterruptThreshold(high=10,low=0,persistance=7)
-apds9960.prox.enableInterrupt()
 
 ProxThPin=machine.Pin(0, machine.Pin.IN ,machine.Pin.PULL_UP)
-
-sleep_ms(50)
+apds9960.attachInterrupt(ProxThPin)   # Samples are read and the IRQ cleared by the pin IRQ 
+apds9960.prox.enableInterrupt()       # Enabled after attaching, the first falling edge is seen
 
 while True:
-    sleep_ms(50)
-
-    if(ProxThPin.value()==0):
-        print("proximity:", apds9960.prox.proximityLevel )
-        apds9960.prox.clearInterrupt()  
+    sample=apds9960.pollInterrupt()   # Also services an interrupt the pin IRQ missed
+    if sample is None:
+        machine.idle()                # Wait for the next interrupt
+        continue
+    ticks,channel,level=sample
+    print("proximity:", level, "at", ticks, "us")
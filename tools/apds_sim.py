@@ -0,0 +1,604 @@
+"""`apds_sim`
+====================================================
+
+Host side (CPython) simulation of the APDS9960 and APDS9900 I2C register files.
+Used to test and benchmark the drivers without hardware.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    import sys
+    sys.path.insert(0,'tools')
+    from apds_sim import SimI2C, APDS9960Sim
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+
+    sim=APDS9960Sim(proximity=[0,0,50,200,200,20])   # One value per proximity cycle
+    i2c=SimI2C(sim)
+    apds9960=APDS9960LITE(i2c)
+    apds9960.prox.enableSensor()
+    sim.advance(10)                                  # Run the sensor for 10 ms
+    print(apds9960.prox.proximityLevel, i2c.transactions, i2c.bytesRead)
+"""
+import errno
+
+
+def _wave(src, t, n):
+    """Returns a waveform value: src is a constant (int or tuple), a list (indexed by cycle n,
+    the last value is held) or a function of the time t (ms)"""
+    if callable(src):
+        return src(t)
+    if isinstance(src, list):
+        if not src:
+            return 0
+        return src[n] if n < len(src) else src[-1]
+    return src
+
+
+def _apers(apers):
+    """Number of consecutive out of range ALS cycles needed for an interrupt (APERS field)"""
+    if apers <= 3:
+        return apers
+    return 5 * (apers - 3)
+
+
+def _offset(val):
+    """Sign-magnitude POFFSET register value, positive offsets reduce the proximity level"""
+    return -(val & 0x7F) if val & 0x80 else val
+
+
+class SimPin:
+    """Simulated INT pin (active low) with the machine.Pin irq() interface"""
+    IRQ_FALLING = 1
+    IRQ_RISING = 2
+
+    def __init__(self):
+        self.__value = 1
+        self.__handler = None
+        self.__trigger = 0
+
+    def value(self):
+        return self.__value
+
+    def irq(self, handler=None, trigger=IRQ_FALLING):
+        self.__handler = handler
+        self.__trigger = trigger
+
+    def _drive(self, value):
+        """Sets the pin level, calls the IRQ handler on a matching edge"""
+        old = self.__value
+        self.__value = value
+        if self.__handler is None or old == value:
+            return
+        if (value == 0 and self.__trigger & self.IRQ_FALLING) or \
+           (value == 1 and self.__trigger & self.IRQ_RISING):
+            self.__handler(self)
+
+
+class SimI2C:
+    """Simulated I2C bus with the machine.I2C memory interface.
+    Counts transactions and bytes so the bus cost of each driver call can be measured.
+
+    :param devices: Simulated devices (their address attribute is used)
+    """
+
+    def __init__(self, *devices):
+        self.devices = {}
+        for dev in devices:
+            self.devices[dev.address] = dev
+        self.failures = 0       # Number of following transactions that are NACKed
+        self.resetCounters()
+
+    def resetCounters(self):
+        """Clears the transaction and byte counters"""
+        self.transactions = 0
+        self.bytesRead = 0
+        self.bytesWritten = 0
+        self.log = []
+
+    def counters(self):
+        """Returns (transactions, bytesRead, bytesWritten)"""
+        return (self.transactions, self.bytesRead, self.bytesWritten)
+
+    def __device(self, addr):
+        self.transactions += 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError(errno.ENODEV)
+        dev = self.devices.get(addr)
+        if dev is None:
+            dev = self.__routed(addr)
+        if dev is None or not dev.present:
+            raise OSError(errno.ENODEV)
+        return dev
+
+    def __routed(self, addr):
+        """Device behind a multiplexer (TCA9548ASim) channel, None when not connected"""
+        for mux in self.devices.values():
+            route = getattr(mux, 'route', None)
+            if route is not None:
+                dev = route(addr)
+                if dev is not None:
+                    return dev
+        return None
+
+    def scan(self):
+        found = set(a for a, d in self.devices.items() if d.present)
+        for mux in self.devices.values():
+            if hasattr(mux, 'route'):
+                found.update(mux.connected())
+        return sorted(found)
+
+    def readfrom_mem(self, addr, reg, n, addrsize=8):
+        buf = bytearray(n)
+        self.readfrom_mem_into(addr, reg, buf)
+        return bytes(buf)
+
+    def readfrom_mem_into(self, addr, reg, buf, addrsize=8):
+        dev = self.__device(addr)
+        mv = memoryview(buf).cast('B')
+        data = dev.read(reg, len(mv))
+        mv[:] = data
+        self.bytesRead += len(mv)
+        self.log.append(('r', reg, len(mv)))
+
+    def writeto_mem(self, addr, reg, buf, addrsize=8):
+        dev = self.__device(addr)
+        data = bytes(buf)
+        dev.write(reg, data)
+        self.bytesWritten += len(data)
+        self.log.append(('w', reg, len(data)))
+
+    def readfrom(self, addr, n, stop=True):
+        dev = self.__device(addr)
+        self.bytesRead += n
+        self.log.append(('r', None, n))
+        return bytes(dev.readRaw(n))
+
+    def readfrom_into(self, addr, buf, stop=True):
+        mv = memoryview(buf).cast('B')
+        mv[:] = self.readfrom(addr, len(mv), stop)
+
+    def writeto(self, addr, buf, stop=True):
+        dev = self.__device(addr)
+        data = bytes(buf)
+        dev.writeRaw(data)
+        self.bytesWritten += len(data)
+        self.log.append(('w', None, len(data)))
+        return len(data)
+
+
+class TCA9548ASim:
+    """TCA9548A I2C multiplexer, the devices on the selected channels are visible on the bus.
+
+    :param channels: {channel: device or list of devices}
+    :param address: I2C address (Default 0x70)
+    """
+
+    def __init__(self, channels=None, address=0x70):
+        self.address = address
+        self.present = True
+        self.control = 0
+        self.channels = {}
+        for ch, devs in (channels or {}).items():
+            self.channels[ch] = devs if isinstance(devs, list) else [devs]
+
+    def __selected(self):
+        for ch, devs in self.channels.items():
+            if self.control & (1 << ch):
+                yield from devs
+
+    def route(self, addr):
+        """Returns the device with the address on a selected channel"""
+        found = [d for d in self.__selected() if d.address == addr and d.present]
+        if len(found) > 1:
+            raise OSError(errno.EIO)    # Address conflict between the selected channels
+        return found[0] if found else None
+
+    def connected(self):
+        return [d.address for d in self.__selected() if d.present]
+
+    def read(self, reg, n):
+        return bytes((self.control,)) * n
+
+    def write(self, reg, data):
+        self.control = data[-1]
+
+    def readRaw(self, n):
+        return bytes((self.control,)) * n
+
+    def writeRaw(self, data):
+        if data:
+            self.control = data[-1]
+
+
+class APDS9960Sim:
+    """APDS9960 register file with proximity / ALS / gesture engines.
+
+    :param proximity: Proximity waveform (0 - 255), constant, per cycle list or function of ms
+    :param light: (clear, red, green, blue) waveform, constant tuple, per cycle list or function of ms
+    :param address: I2C address (Default 0x39)
+    """
+    ID = 0xAB
+
+    def __init__(self, proximity=0, light=(0, 0, 0, 0), address=0x39):
+        self.address = address
+        self.present = True
+        self.proximity = proximity
+        self.light = light
+        self.pin = SimPin()
+        self.gestureRate = 4    # Datasets added to the FIFO per gesture cycle
+        self.scaleLight = False # True: light is counts per 2.78 ms at 1x gain, scaled by AGAIN and ATIME
+        self.reset()
+
+    def reset(self):
+        """Power-on reset"""
+        r = self.regs = bytearray(256)
+        r[0x81] = 0xFF          # ATIME
+        r[0x83] = 0xFF          # WTIME
+        r[0x8D] = 0x60          # CONFIG1
+        r[0x8E] = 0x40          # PPULSE
+        r[0x90] = 0x01          # CONFIG2
+        r[0x92] = self.ID       # ID
+        r[0xA6] = 0x40          # GPULSE
+        self.fifo = []
+        self.gestureScript = []
+        self.t = 0.0            # Simulated time (ms)
+        self.cycles = 0
+        self.__elapsed = 0.0
+        self.__pcount = 0       # Consecutive out of range cycles
+        self.__acount = 0
+
+    # --- timing -----------------------------------------------------------------------------
+    def cycleMs(self):
+        """Duration of one state machine cycle (ms), None when idle"""
+        r = self.regs
+        en = r[0x80]
+        if not en & 0x01 or not en & 0x46:          # PON and PEN/AEN/GEN
+            return None
+        ms = 0.0
+        if en & 0x04:
+            ms += 0.7                               # Proximity pulses
+        if en & 0x02:
+            ms += 2.78 * (256 - r[0x81])            # ALS integration
+        if en & 0x08:
+            ms += 2.78 * (256 - r[0x83]) * (12 if r[0x8D] & 0x02 else 1)
+        return max(ms, 0.7)
+
+    def advance(self, ms):
+        """Runs the sensor for ms milliseconds of simulated time"""
+        end = self.t + ms
+        self.__elapsed += ms
+        while True:
+            c = self.cycleMs()
+            if c is None:
+                self.__elapsed = 0.0
+                break
+            if self.__elapsed < c:
+                break
+            self.__elapsed -= c
+            self.t = end - self.__elapsed
+            self.__cycle()
+        self.t = end
+
+    def loadGesture(self, datasets):
+        """Queues (U, D, L, R) datasets delivered while the device is in gesture mode"""
+        self.gestureScript.extend(tuple(d) for d in datasets)
+
+    # --- state machine ------------------------------------------------------------------------
+    def __cycle(self):
+        r = self.regs
+        en = r[0x80]
+        n = self.cycles
+        self.cycles += 1
+        if en & 0x04:                               # PEN
+            p = int(_wave(self.proximity, self.t, n)) - (_offset(r[0x9D]) + _offset(r[0x9E])) // 2
+            p = max(0, min(255, p))
+            r[0x9C] = p
+            r[0x93] |= 0x02                         # PVALID
+            if p < r[0x89] or p > r[0x8B]:
+                self.__pcount += 1
+            else:
+                self.__pcount = 0
+            ppers = r[0x8C] >> 4
+            if ppers == 0 or self.__pcount >= ppers:
+                r[0x93] |= 0x20                     # PINT
+            if en & 0x40 and p > r[0xA0]:           # GEN and above GPENTH
+                r[0xAB] |= 0x01                     # GMODE
+        if en & 0x02:                               # AEN
+            c, red, g, b = _wave(self.light, self.t, n)
+            sat = min(65535, 1025 * (256 - r[0x81]))
+            scale = (1, 4, 16, 64)[r[0x8F] & 0x03] * (256 - r[0x81]) if self.scaleLight else 1
+            for i, v in enumerate((c, red, g, b)):
+                v = max(0, min(sat, int(v * scale)))
+                r[0x94 + 2 * i] = v & 0xFF
+                r[0x95 + 2 * i] = v >> 8
+            if c * scale >= sat:
+                r[0x93] |= 0x80                     # CPSAT
+            r[0x93] |= 0x01                         # AVALID
+            c = r[0x94] | (r[0x95] << 8)
+            low = r[0x84] | (r[0x85] << 8)
+            high = r[0x86] | (r[0x87] << 8)
+            if c < low or c > high:
+                self.__acount += 1
+            else:
+                self.__acount = 0
+            apers = _apers(r[0x8C] & 0x0F)
+            if apers == 0 or self.__acount >= max(apers, 1):
+                r[0x93] |= 0x10                     # AINT
+        if en & 0x40 and r[0xAB] & 0x01:            # Gesture mode
+            for i in range(self.gestureRate):
+                if not self.gestureScript:
+                    r[0xAB] &= ~0x01                # Exit gesture mode
+                    break
+                if len(self.fifo) >= 32:
+                    r[0xAF] |= 0x02                 # GFOV
+                    self.gestureScript.pop(0)
+                    continue
+                self.fifo.append(self.gestureScript.pop(0))
+            self.__gestureStatus()
+        self.__updatePin()
+
+    def __gestureStatus(self):
+        r = self.regs
+        level = len(self.fifo)
+        r[0xAE] = level
+        threshold = (1, 4, 8, 16)[r[0xA2] >> 6]
+        if level >= threshold:
+            r[0xAF] |= 0x01                         # GVALID
+            r[0x93] |= 0x04                         # GINT
+        else:
+            r[0xAF] &= ~0x01
+            if level == 0:
+                r[0x93] &= ~0x04
+                r[0xAF] &= ~0x02
+
+    @property
+    def interrupt(self):
+        """True while the INT output is asserted"""
+        r = self.regs
+        en = r[0x80]
+        return bool((r[0x93] & 0x20 and en & 0x20) or (r[0x93] & 0x10 and en & 0x10) or
+                    (r[0x93] & 0x04 and r[0xAB] & 0x02))
+
+    def __updatePin(self):
+        self.pin._drive(0 if self.interrupt else 1)
+
+    # --- I2C access ---------------------------------------------------------------------------
+    def __special(self, reg):
+        """Address accessed special function registers"""
+        r = self.regs
+        if reg == 0xE4:                             # IFORCE
+            r[0x93] |= 0x30
+        elif reg == 0xE5:                           # PICLEAR
+            r[0x93] &= ~0x20
+            self.__pcount = 0
+        elif reg == 0xE6:                           # CICLEAR
+            r[0x93] &= ~0x10
+            self.__acount = 0
+        elif reg == 0xE7:                           # AICLEAR
+            r[0x93] &= ~0x30
+            self.__pcount = 0
+            self.__acount = 0
+
+    def read(self, reg, n):
+        r = self.regs
+        out = bytearray()
+        for i in range(n):
+            if reg >= 0xFC:                         # FIFO, wraps within 0xFC - 0xFF
+                k = reg - 0xFC
+                out.append(self.fifo[0][k] if self.fifo else 0)
+                if k == 3:
+                    if self.fifo:
+                        self.fifo.pop(0)
+                    self.__gestureStatus()
+                    reg = 0xFC
+                else:
+                    reg += 1
+                continue
+            out.append(r[reg])
+            if 0xE4 <= reg <= 0xE7:
+                self.__special(reg)
+            elif reg == 0x9C:
+                r[0x93] &= ~0x02                    # PVALID cleared by reading PDATA
+            elif 0x94 <= reg <= 0x9B:
+                r[0x93] &= ~0x81                    # AVALID / CPSAT cleared by reading ALS data
+            reg = (reg + 1) & 0xFF
+        self.__updatePin()
+        return bytes(out)
+
+    def write(self, reg, data):
+        r = self.regs
+        for v in data:
+            if 0xE4 <= reg <= 0xE7:
+                self.__special(reg)
+            elif reg == 0xAB:                       # GCONF4
+                if v & 0x04:                        # GFIFO_CLR
+                    self.fifo = []
+                    self.__gestureStatus()
+                r[reg] = v & 0x03
+            elif not (0x92 <= reg <= 0x9C or reg in (0xAE, 0xAF) or reg >= 0xFC):
+                if reg == 0x80 and r[reg] & 0x02 and not v & 0x02:
+                    r[0x93] &= ~0x81                # AEN cleared, AVALID / CPSAT reset
+                r[reg] = v                          # Read-only registers are ignored
+            reg = (reg + 1) & 0xFF
+        self.__updatePin()
+
+    def readRaw(self, n):
+        return bytes(n)
+
+    def writeRaw(self, data):
+        pass
+
+
+class APDS9900Sim:
+    """APDS9900 register file with the command byte protocol.
+    The command byte is CMD (bit 7) | TYPE (bits 6:5) | ADD (bits 4:0), TYPE 00 repeats
+    the same register, 01 auto-increments and 11 is a special function (5 proximity,
+    6 ALS, 7 both interrupt clear). As on the chip, reading a data low byte latches the high byte.
+
+    :param proximity: Proximity waveform (0 - 1023), constant, per cycle list or function of ms
+    :param light: (CH0, CH1) waveform, constant tuple, per cycle list or function of ms
+    :param address: I2C address (Default 0x39)
+    """
+    ID = 0x29
+
+    def __init__(self, proximity=0, light=(0, 0), address=0x39):
+        self.address = address
+        self.present = True
+        self.proximity = proximity
+        self.light = light
+        self.pin = SimPin()
+        self.reset()
+
+    def reset(self):
+        """Power-on reset"""
+        r = self.regs = bytearray(32)
+        r[0x01] = 0xFF          # ATIME
+        r[0x02] = 0xFF          # PTIME
+        r[0x03] = 0xFF          # WTIME
+        r[0x12] = self.ID       # ID
+        self.__latch = 0
+        self.t = 0.0
+        self.cycles = 0
+        self.__elapsed = 0.0
+        self.__pcount = 0
+        self.__acount = 0
+
+    def cycleMs(self):
+        """Duration of one state machine cycle (ms), None when idle"""
+        r = self.regs
+        en = r[0x00]
+        if not en & 0x01 or not en & 0x06:
+            return None
+        ms = 0.0
+        if en & 0x04:
+            ms += 2.72 * (256 - r[0x02])
+        if en & 0x02:
+            ms += 2.72 * (256 - r[0x01])
+        if en & 0x08:
+            ms += 2.72 * (256 - r[0x03]) * (12 if r[0x0D] & 0x02 else 1)
+        return ms
+
+    def advance(self, ms):
+        """Runs the sensor for ms milliseconds of simulated time"""
+        end = self.t + ms
+        self.__elapsed += ms
+        while True:
+            c = self.cycleMs()
+            if c is None:
+                self.__elapsed = 0.0
+                break
+            if self.__elapsed < c:
+                break
+            self.__elapsed -= c
+            self.t = end - self.__elapsed
+            self.__cycle()
+        self.t = end
+
+    def __cycle(self):
+        r = self.regs
+        en = r[0x00]
+        n = self.cycles
+        self.cycles += 1
+        if en & 0x04:
+            p = max(0, min(1023, int(_wave(self.proximity, self.t, n))))
+            r[0x18] = p & 0xFF
+            r[0x19] = p >> 8
+            r[0x13] |= 0x02
+            low = r[0x08] | (r[0x09] << 8)
+            high = r[0x0A] | (r[0x0B] << 8)
+            self.__pcount = self.__pcount + 1 if (p < low or p > high) else 0
+            ppers = r[0x0C] >> 4
+            if ppers == 0 or self.__pcount >= ppers:
+                r[0x13] |= 0x20
+        if en & 0x02:
+            sat = min(65535, 1024 * (256 - r[0x01]))
+            ch0, ch1 = _wave(self.light, self.t, n)
+            ch0 = max(0, min(sat, int(ch0)))
+            ch1 = max(0, min(sat, int(ch1)))
+            r[0x14] = ch0 & 0xFF
+            r[0x15] = ch0 >> 8
+            r[0x16] = ch1 & 0xFF
+            r[0x17] = ch1 >> 8
+            r[0x13] |= 0x01
+            low = r[0x04] | (r[0x05] << 8)
+            high = r[0x06] | (r[0x07] << 8)
+            self.__acount = self.__acount + 1 if (ch0 < low or ch0 > high) else 0
+            apers = _apers(r[0x0C] & 0x0F)
+            if apers == 0 or self.__acount >= max(apers, 1):
+                r[0x13] |= 0x10
+        self.__updatePin()
+
+    @property
+    def interrupt(self):
+        """True while the INT output is asserted"""
+        r = self.regs
+        return bool((r[0x13] & 0x20 and r[0x00] & 0x20) or (r[0x13] & 0x10 and r[0x00] & 0x10))
+
+    def __updatePin(self):
+        self.pin._drive(0 if self.interrupt else 1)
+
+    def __special(self, sf):
+        r = self.regs
+        if sf in (0x05, 0x07):
+            r[0x13] &= ~0x20
+            self.__pcount = 0
+        if sf in (0x06, 0x07):
+            r[0x13] &= ~0x10
+            self.__acount = 0
+
+    def __readReg(self, reg):
+        r = self.regs
+        if reg in (0x14, 0x16, 0x18):               # Low byte latches the high byte
+            self.__latch = r[reg + 1]
+            if reg == 0x18:
+                r[0x13] &= ~0x02
+            else:
+                r[0x13] &= ~0x01
+            return r[reg]
+        if reg in (0x15, 0x17, 0x19):
+            return self.__latch
+        return r[reg]
+
+    def read(self, cmd, n):
+        if not cmd & 0x80:                          # No CMD bit, not a command
+            return bytes(n)
+        kind = (cmd >> 5) & 0x03
+        reg = cmd & 0x1F
+        if kind == 0x03:
+            self.__special(reg)
+            self.__updatePin()
+            return bytes(n)
+        out = bytearray()
+        for i in range(n):
+            out.append(self.__readReg(reg))
+            if kind == 0x01:
+                reg = (reg + 1) & 0x1F
+        self.__updatePin()
+        return bytes(out)
+
+    def write(self, cmd, data):
+        if not cmd & 0x80:                          # No CMD bit, not a command
+            return
+        kind = (cmd >> 5) & 0x03
+        reg = cmd & 0x1F
+        if kind == 0x03:
+            self.__special(reg)
+            self.__updatePin()
+            return
+        for v in data:
+            if reg < 0x10:                          # 0x10 - 0x1F are read-only
+                self.regs[reg] = v
+            if kind == 0x01:
+                reg = (reg + 1) & 0x1F
+        self.__updatePin()
+
+    def readRaw(self, n):
+        return bytes(n)
+
+    def writeRaw(self, data):
+        if data:                                    # Command byte (ex. special function) + data
+            self.write(data[0], data[1:])
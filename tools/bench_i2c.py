@@ -0,0 +1,272 @@
+"""`bench_i2c`
+====================================================
+
+I2C cost benchmark of the apds9960LITE and apds9900LITE public API.
+Every call is run against the simulated bus (apds_sim.SimI2C) and the number of
+I2C transactions, bytes transferred, bytes allocated by the driver (CPython tracemalloc peak of
+the call minus the peak of replaying its I2C calls on the simulator alone) and wall time are reported.
+The run fails if a call uses more transactions, bytes or allocated bytes than recorded in bench_budget.json.
+
+    python tools/bench_i2c.py            # Report and check the budget
+    python tools/bench_i2c.py --update   # Record the current costs as the new budget
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+from apds_sim import SimI2C, SimPin, APDS9960Sim, APDS9900Sim  # noqa: E402
+import uPy_APDS9960.apds9960LITE as apds9960LITE            # noqa: E402
+import uPy_APDS9900.apds9900LITE as apds9900LITE            # noqa: E402
+
+BUDGET = os.path.join(HERE, 'bench_budget.json')
+
+# The power-up delays are not part of the bus cost
+apds9960LITE.sleep = lambda s: None
+apds9900LITE.sleep = lambda s: None
+
+
+def _setupProxIrq(d):
+    with d.configure():
+        d.prox.eLEDCurrent = 0
+        d.prox.eProximityGain = 3
+        d.prox.enableSensor()
+        d.prox.setInterruptThreshold(high=10, low=0, persistance=7)
+        d.prox.enableInterrupt()
+
+
+def _setupProxIrqUnbatched(d):
+    d.prox.eLEDCurrent = 0
+    d.prox.eProximityGain = 3
+    d.prox.enableSensor()
+    d.prox.setInterruptThreshold(high=10, low=0, persistance=7)
+    d.prox.enableInterrupt()
+
+
+def _service(d):
+    if d.samples is None:
+        d.attachInterrupt(SimPin())
+    d.serviceInterrupt()
+
+
+def _set(obj, name, value):
+    setattr(obj, name, value)
+
+
+# (name, function called with the driver)
+CASES_9960 = [
+    ('powerOn', lambda d: d.powerOn(True)),
+    ('statusRegister', lambda d: d.statusRegister),
+    ('resync', lambda d: d.resync()),
+    ('configure (prox irq setup)', _setupProxIrq),
+    ('prox irq setup (unbatched)', _setupProxIrqUnbatched),
+    ('serviceInterrupt', _service),
+    ('prox.enableSensor', lambda d: d.prox.enableSensor()),
+    ('prox.proximityLevel', lambda d: d.prox.proximityLevel),
+    ('prox.eProximityGain get', lambda d: d.prox.eProximityGain),
+    ('prox.eProximityGain set', lambda d: _set(d.prox, 'eProximityGain', 3)),
+    ('prox.eLEDCurrent get', lambda d: d.prox.eLEDCurrent),
+    ('prox.eLEDCurrent set', lambda d: _set(d.prox, 'eLEDCurrent', 1)),
+    ('prox.pulseLength set', lambda d: _set(d.prox, 'pulseLength', 2)),
+    ('gesture.enterThreshold set', lambda d: _set(d.gesture, 'enterThreshold', 40)),
+    ('prox.setInterruptThreshold', lambda d: d.prox.setInterruptThreshold(high=10, low=0, persistance=7)),
+    ('prox.enableInterrupt', lambda d: d.prox.enableInterrupt()),
+    ('prox.clearInterrupt', lambda d: d.prox.clearInterrupt()),
+    ('prox.pulseCount set', lambda d: _set(d.prox, 'pulseCount', 8)),
+    ('prox.offsetUR get', lambda d: d.prox.offsetUR),
+    ('prox.offsetUR set', lambda d: _set(d.prox, 'offsetUR', 10)),
+    ('als.enableSensor', lambda d: d.als.enableSensor()),
+    ('als.ambientLightLevel', lambda d: d.als.ambientLightLevel),
+    ('als.redLightLevel', lambda d: d.als.redLightLevel),
+    ('als.greenLightLevel', lambda d: d.als.greenLightLevel),
+    ('als.blueLightLevel', lambda d: d.als.blueLightLevel),
+    ('als.readRGBC', lambda d: d.als.readRGBC()),
+    ('als.readNormalized', lambda d: d.als.readNormalized()),
+    ('als.lux', lambda d: d.als.lux),
+    ('als.colorTemperature', lambda d: d.als.colorTemperature),
+    ('als.enableAutoRange', lambda d: d.als.enableAutoRange()),
+    ('als.readNormalized (auto range)', lambda d: d.als.readNormalized()),
+    ('als.eLightGain get', lambda d: d.als.eLightGain),
+    ('als.eLightGain set', lambda d: _set(d.als, 'eLightGain', 2)),
+    ('als.setInterruptThreshold', lambda d: d.als.setInterruptThreshold(high=100, low=0, persistance=7)),
+    ('als.enableInterrupt', lambda d: d.als.enableInterrupt()),
+    ('als.clearInterrupt', lambda d: d.als.clearInterrupt()),
+    ('gesture.enableSensor', lambda d: d.gesture.enableSensor()),
+    ('gesture.setThreshold', lambda d: d.gesture.setThreshold()),
+    ('gesture.enableInterrupt', lambda d: d.gesture.enableInterrupt()),
+    ('gesture.fifoLevel', lambda d: d.gesture.fifoLevel),
+    ('gesture.readGesture', lambda d: d.gesture.readGesture()),
+    ('integrationTime set', lambda d: _set(d, 'integrationTime', 100)),
+    ('waitTime set', lambda d: _set(d, 'waitTime', 1000)),
+    ('sampleRate', lambda d: d.sampleRate),
+    ('setTiming', lambda d: d.setTiming('max rate')),
+]
+
+CASES_9900 = [
+    ('powerOn', lambda d: d.powerOn(True)),
+    ('statusRegister', lambda d: d.statusRegister),
+    ('prox.enableSensor', lambda d: d.prox.enableSensor()),
+    ('prox.proximityLevel', lambda d: d.prox.proximityLevel),
+    ('prox.eProximityGain get', lambda d: d.prox.eProximityGain),
+    ('prox.eProximityGain set', lambda d: _set(d.prox, 'eProximityGain', 3)),
+    ('prox.eLEDCurrent get', lambda d: d.prox.eLEDCurrent),
+    ('prox.eLEDCurrent set', lambda d: _set(d.prox, 'eLEDCurrent', 1)),
+    ('prox.setInterruptThreshold', lambda d: d.prox.setInterruptThreshold(high=10, low=0, persistance=7)),
+    ('prox.enableInterrupt', lambda d: d.prox.enableInterrupt()),
+    ('prox.clearInterrupt', lambda d: d.prox.clearInterrupt()),
+    ('als.enableSensor', lambda d: d.als.enableSensor()),
+    ('als.ambientLightLevel', lambda d: d.als.ambientLightLevel),
+    ('als.infraredLightLevel', lambda d: d.als.infraredLightLevel),
+    ('als.lux', lambda d: d.als.lux),
+    ('als.eLightGain get', lambda d: d.als.eLightGain),
+    ('als.eLightGain set', lambda d: _set(d.als, 'eLightGain', 2)),
+    ('als.setInterruptThreshold', lambda d: d.als.setInterruptThreshold(high=100, low=0, persistance=7)),
+    ('als.enableInterrupt', lambda d: d.als.enableInterrupt()),
+    ('als.clearInterrupt', lambda d: d.als.clearInterrupt()),
+    ('integrationTime set', lambda d: _set(d, 'integrationTime', 100)),
+    ('waitTime set', lambda d: _set(d, 'waitTime', 1000)),
+    ('sampleRate', lambda d: d.sampleRate),
+    ('setTiming', lambda d: d.setTiming('max rate')),
+    ('readData', lambda d: d.readData()),
+]
+
+# (suite name, simulated device, driver factory, cases)
+SUITES = [
+    ('apds9960', APDS9960Sim, lambda i2c: apds9960LITE.APDS9960LITE(i2c), CASES_9960),
+    ('apds9960 cache', APDS9960Sim, lambda i2c: apds9960LITE.APDS9960LITE(i2c, cache=True), CASES_9960),
+    ('apds9900', APDS9900Sim, lambda i2c: apds9900LITE.APDS9900LITE(i2c), CASES_9900),
+    ('apds9900 cache', APDS9900Sim, lambda i2c: apds9900LITE.APDS9900LITE(i2c, cache=True), CASES_9900),
+]
+
+
+I2C_METHODS = ('readfrom_mem_into', 'readfrom_mem', 'writeto_mem', 'readfrom_into', 'readfrom', 'writeto')
+
+
+def record(i2c, func):
+    """Calls func, returns the I2C calls it made as (method, args, kwargs)"""
+    calls = []
+    depth = [0]
+
+    def wrap(method):
+        def call(*args, **kwargs):
+            if not depth[0]:    # Calls made by the simulator itself are not recorded
+                calls.append((method, args, kwargs))
+            depth[0] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return call
+
+    for name in I2C_METHODS:
+        setattr(i2c, name, wrap(getattr(i2c, name)))
+    try:
+        func()
+    finally:
+        for name in I2C_METHODS:
+            delattr(i2c, name)
+    return calls
+
+
+def replay(calls):
+    """Repeats the recorded I2C calls without the driver"""
+    for method, args, kwargs in calls:
+        method(*args, **kwargs)
+
+
+def peak(i2c, func):
+    """Returns the tracemalloc peak (bytes) of one call of func"""
+    i2c.resetCounters()         # The transaction log grows from empty in every measurement
+    gc.collect()                # Empties the CPython free lists, every measurement starts alike
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func()
+    used = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return used
+
+
+def measure(i2c, func, repeat):
+    """Returns (transactions, bytes, alloc, ns) of one call of func.
+    alloc is the driver's share of the allocation peak: the peak of the call minus
+    the peak of replaying its I2C calls on the simulator alone."""
+    i2c.resetCounters()
+    calls = record(i2c, func)
+    transactions, rd, wr = i2c.counters()
+
+    simulator = peak(i2c, lambda: replay(calls))
+    alloc = max(0, peak(i2c, func) - simulator)
+
+    t = time.perf_counter_ns()
+    for i in range(repeat):
+        func()
+    ns = (time.perf_counter_ns() - t) // repeat
+    return transactions, rd + wr, alloc, ns
+
+
+def run(repeat):
+    """Runs all suites, returns {key: (transactions, bytes, alloc, ns)}"""
+    results = {}
+    for suite, sim, factory, cases in SUITES:
+        dev = sim()
+        i2c = SimI2C(dev)
+        results[suite + '/construct'] = measure(i2c, lambda: factory(i2c), repeat)
+        driver = factory(i2c)
+        for name, func in cases:
+            results[suite + '/' + name] = measure(i2c, lambda: func(driver), repeat)
+            dev.advance(50)     # Let the sensor produce new data between calls
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--update', action='store_true', help='record the current costs as the budget')
+    parser.add_argument('--repeat', type=int, default=200, help='calls per wall time measurement')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    budget = {}
+    if os.path.exists(BUDGET):
+        with open(BUDGET) as f:
+            budget = json.load(f)
+
+    failed = []
+    print('%-45s %6s %6s %7s %9s  %s' % ('call', 'trans', 'bytes', 'alloc', 'ns', 'budget'))
+    for key, (trans, nbytes, alloc, ns) in results.items():
+        limit = budget.get(key)
+        if limit is None:
+            status = 'new'
+        elif trans > limit['transactions'] or nbytes > limit['bytes'] or alloc > limit.get('alloc', 0):
+            status = 'OVER (%d/%d/%d)' % (limit['transactions'], limit['bytes'], limit.get('alloc', 0))
+            failed.append(key)
+        elif trans < limit['transactions'] or nbytes < limit['bytes'] or alloc < limit.get('alloc', 0):
+            status = 'under (%d/%d/%d)' % (limit['transactions'], limit['bytes'], limit.get('alloc', 0))
+        else:
+            status = 'ok'
+        print('%-45s %6d %6d %7d %9d  %s' % (key, trans, nbytes, alloc, ns, status))
+
+    if args.update:
+        with open(BUDGET, 'w') as f:
+            json.dump({k: {'transactions': v[0], 'bytes': v[1], 'alloc': v[2]} for k, v in results.items()},
+                      f, indent=1, sort_keys=True)
+            f.write('\n')
+        print('Budget written to', BUDGET)
+        return 0
+    if failed:
+        print('%d call(s) over the I2C / allocation budget: %s' % (len(failed), ', '.join(failed)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""`build_mpy`
+====================================================
+
+Low RAM build of the driver for frozen modules or for copying to the board.
+The docstrings (module, class, function and attribute docstrings) and comments are
+stripped from uPy_APDS9960 and uPy_APDS9900 and the stripped sources are compiled
+with mpy-cross. Importing a .mpy file skips the compiler on the board, so import time
+and the heap used while importing go down (the docstrings are never loaded).
+
+    python tools/build_mpy.py                          # build/uPy_APDS9960/*.mpy, build/uPy_APDS9900/*.mpy
+    python tools/build_mpy.py --march xtensa           # ESP8266 native code emitters allowed
+    python tools/build_mpy.py --strip-only             # Stripped .py only (ex. for a frozen manifest)
+
+mpy-cross is taken from the PATH or the mpy-cross pip package (pip install mpy-cross),
+use the mpy-cross matching the firmware version.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+import argparse
+import ast
+import os
+import shutil
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+PACKAGES = ('uPy_APDS9960', 'uPy_APDS9900')
+
+
+class DocstringStripper(ast.NodeTransformer):
+    """Removes the string literal statements (docstrings) from all bodies"""
+
+    def __strip(self, node):
+        self.generic_visit(node)
+        body = [n for n in node.body
+                if not (isinstance(n, ast.Expr) and isinstance(n.value, ast.Constant)
+                        and isinstance(n.value.value, str))]
+        node.body = body or [ast.Pass()]
+        return node
+
+    visit_Module = __strip
+    visit_ClassDef = __strip
+    visit_FunctionDef = __strip
+    visit_AsyncFunctionDef = __strip
+
+
+def strip(source):
+    """Returns the source without docstrings and comments"""
+    tree = DocstringStripper().visit(ast.parse(source))
+    return ast.unparse(ast.fix_missing_locations(tree)) + '\n'
+
+
+def findMpyCross(path):
+    """Returns the mpy-cross command line prefix or None"""
+    if path:
+        return [path]
+    exe = shutil.which('mpy-cross')
+    if exe:
+        return [exe]
+    try:
+        import mpy_cross  # noqa: F401
+    except ImportError:
+        return None
+    return [sys.executable, '-m', 'mpy_cross']
+
+
+def build(out, mpyCross, march=None, opt=None):
+    """Strips and compiles all modules, returns [(module, source bytes, stripped bytes, mpy bytes)]"""
+    results = []
+    for package in PACKAGES:
+        src = os.path.join(ROOT, package)
+        dst = os.path.join(out, package)
+        os.makedirs(dst, exist_ok=True)
+        for name in sorted(os.listdir(src)):
+            if not name.endswith('.py'):
+                continue
+            with open(os.path.join(src, name), encoding='utf-8') as f:
+                source = f.read()
+            stripped = strip(source)
+            py = os.path.join(dst, name)
+            with open(py, 'w', encoding='utf-8') as f:
+                f.write(stripped)
+            module = package + '/' + name
+            size = None
+            if mpyCross:
+                mpy = py[:-3] + '.mpy'
+                cmd = mpyCross + ['-o', mpy, '-s', module]
+                if march:
+                    cmd.append('-march=' + march)
+                if opt is not None:
+                    cmd.append('-O%d' % opt)
+                subprocess.run(cmd + [py], check=True)
+                os.remove(py)
+                size = os.path.getsize(mpy)
+            results.append((module, len(source.encode('utf-8')), len(stripped.encode('utf-8')), size))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--out', default=os.path.join(ROOT, 'build'), help='output folder (Default build)')
+    parser.add_argument('--strip-only', action='store_true', help='write the stripped .py files, no mpy-cross')
+    parser.add_argument('--mpy-cross', help='the mpy-cross executable')
+    parser.add_argument('--march', help='mpy-cross -march (ex. xtensa, xtensawin, armv6m)')
+    parser.add_argument('-O', dest='opt', type=int, help='mpy-cross optimisation level')
+    args = parser.parse_args(argv)
+
+    mpyCross = None
+    if not args.strip_only:
+        mpyCross = findMpyCross(args.mpy_cross)
+        if mpyCross is None:
+            print('mpy-cross not found, install it (pip install mpy-cross) or use --strip-only')
+            return 1
+
+    results = build(args.out, mpyCross, args.march, args.opt)
+    print('%-32s %8s %9s %8s' % ('module', 'source', 'stripped', 'mpy'))
+    for module, source, stripped, mpy in results:
+        print('%-32s %8d %9d %8s' % (module, source, stripped, '-' if mpy is None else mpy))
+    total = [sum(r[i] or 0 for r in results) for i in (1, 2, 3)]
+    print('%-32s %8d %9d %8s' % ('total', total[0], total[1], total[2] if mpyCross else '-'))
+    print('Written to', args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
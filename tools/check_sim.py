@@ -0,0 +1,331 @@
+"""`check_sim`
+====================================================
+
+Functional checks of the apds9960LITE and apds9900LITE drivers against the simulated sensors
+(apds_sim). Each check drives the driver and compares the returned values and the simulated
+register file with the expected values. The run fails (exit code 1) if any value differs.
+
+    python tools/check_sim.py            # Run all checks
+    python tools/check_sim.py -v         # Also list the passed values
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+from apds_sim import SimI2C, APDS9960Sim, APDS9900Sim          # noqa: E402
+import uPy_APDS9960.apds9960LITE as apds9960LITE            # noqa: E402
+import uPy_APDS9900.apds9900LITE as apds9900LITE            # noqa: E402
+import uPy_APDS9960.events as events                        # noqa: E402
+from uPy_APDS9960 import gesture                            # noqa: E402
+
+# The power-up delays are not simulated
+apds9960LITE.sleep = lambda s: None
+apds9900LITE.sleep = lambda s: None
+
+
+class Checker:
+    """Collects the compared values of all checks"""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.failed = []
+        self.passed = 0
+        self.check = ''
+
+    def equal(self, what, got, expected):
+        """Compares one value"""
+        name = '%s: %s' % (self.check, what)
+        if got == expected:
+            self.passed += 1
+            if self.verbose:
+                print('ok    %s = %r' % (name, got))
+        else:
+            self.failed.append(name)
+            print('FAIL  %s = %r, expected %r' % (name, got, expected))
+
+
+def _recordWrites(sim):
+    """Returns the list of (register, bytes) writes the simulator receives"""
+    writes = []
+    write = sim.write
+
+    def record(reg, data):
+        writes.append((reg, bytes(data)))
+        write(reg, data)
+    sim.write = record
+    return writes
+
+
+def _error(func):
+    """Returns the AttributeError message raised by func or None"""
+    try:
+        func()
+    except AttributeError as e:
+        return str(e)
+    return None
+
+
+def checkRGBC(c):
+    """readRGBC() and the colour properties return clear, red, green, blue"""
+    sim = APDS9960Sim(light=(1000, 200, 300, 400))
+    d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+    d.als.enableSensor()
+    sim.advance(sim.cycleMs())
+    c.equal('readRGBC()', tuple(d.als.readRGBC()), (1000, 200, 300, 400))
+    c.equal('levels', (d.als.ambientLightLevel, d.als.redLightLevel, d.als.greenLightLevel,
+                       d.als.blueLightLevel), (1000, 200, 300, 400))
+
+    sim9900 = APDS9900Sim(light=(1000, 200))
+    d9900 = apds9900LITE.APDS9900LITE(SimI2C(sim9900))
+    d9900.als.enableSensor()
+    sim9900.advance(1000)
+    c.equal('APDS9900 CH0, CH1', (d9900.als.ambientLightLevel, d9900.als.infraredLightLevel), (1000, 200))
+    c.equal('APDS9900 readRGBC', _error(lambda: d9900.als.readRGBC),
+            'readRGBC is not available on the APDS9900')
+    c.equal('APDS9900 colorTemperature', _error(lambda: d9900.als.colorTemperature),
+            'colorTemperature is not available on the APDS9900')
+    c.equal('APDS9900 prox.offsetUR set', _error(lambda: setattr(d9900.prox, 'offsetUR', 3)),
+            'offsetUR is not available on the APDS9900')
+    c.equal('APDS9900 gesture', _error(lambda: d9900.gesture), 'gesture is not available on the APDS9900')
+
+
+def checkConfigure(c):
+    """configure() writes the changed registers on exit, ENABLE last"""
+    for cache in (False, True):
+        sim = APDS9960Sim()
+        d = apds9960LITE.APDS9960LITE(SimI2C(sim), cache=cache)
+        writes = _recordWrites(sim)
+        with d.configure():
+            d.prox.eLEDCurrent = 0
+            d.prox.eProximityGain = 3
+            d.prox.enableSensor()
+            d.prox.setInterruptThreshold(high=10, low=0, persistance=7)
+            d.prox.enableInterrupt()
+            c.equal('cache=%s nothing written inside the block' % cache, writes, [])
+        r = sim.regs
+        c.equal('cache=%s ENABLE written last' % cache, writes[-1], (0x80, b'\x25'))
+        c.equal('cache=%s PILT, PIHT, PERS, CONTROL' % cache,
+                (r[0x89], r[0x8B], r[0x8C] >> 4, r[0x8F]), (0, 10, 7, 0x0C))
+
+        writes[:] = []
+        try:
+            with d.configure():
+                d.prox.eProximityGain = 1
+                raise ValueError
+        except ValueError:
+            pass
+        c.equal('cache=%s exception, nothing written' % cache, writes, [])
+        c.equal('cache=%s exception, PGAIN kept' % cache, d.prox.eProximityGain, 3)
+
+    # Without the register cache a bus error must not leave the temporary cache attached
+    for where in ('enter', 'exit'):
+        sim = APDS9960Sim()
+        i2c = SimI2C(sim)
+        d = apds9960LITE.APDS9960LITE(i2c)
+        d.prox.eProximityGain = 3
+        d.prox.enableSensor()
+        try:
+            if where == 'enter':
+                i2c.failures = 1
+            with d.configure():
+                d.prox.eProximityGain = 1
+                i2c.failures = 1
+        except OSError:
+            pass
+        i2c.failures = 0
+        c.equal('NACK on %s, PGAIN read from the chip' % where, d.prox.eProximityGain, (sim.regs[0x8F] >> 2) & 3)
+        d.als.enableSensor()
+        c.equal('NACK on %s, ENABLE updated from the chip' % where, sim.regs[0x80], 0x07)
+
+
+def checkNestedConfigure(c):
+    """Nested configure() blocks are written once by the outermost block"""
+    for cache in (False, True):
+        sim = APDS9960Sim()
+        d = apds9960LITE.APDS9960LITE(SimI2C(sim), cache=cache)
+        writes = _recordWrites(sim)
+        with d.configure():
+            d.prox.eProximityGain = 3
+            d.setTiming('max rate')
+            c.equal('cache=%s nothing written by the inner block' % cache, writes, [])
+        c.equal('cache=%s PGAIN, ATIME' % cache, ((sim.regs[0x8F] >> 2) & 3, sim.regs[0x81]), (3, 0xFF))
+
+        sim9900 = APDS9900Sim(proximity=300)
+        d9900 = apds9900LITE.APDS9900LITE(SimI2C(sim9900), cache=cache)
+        with d9900.configure():
+            d9900.prox.eProximityGain = 0
+            d9900.prox.enableSensor()
+        r = sim9900.regs
+        c.equal('cache=%s APDS9900 ENABLE, PTIME, PPCOUNT, PDIODE' % cache,
+                (r[0x00], r[0x02], r[0x0E], r[0x0F] >> 4), (0x05, 0xFF, 1, 2))
+        sim9900.advance(10)
+        c.equal('cache=%s APDS9900 proximity' % cache, d9900.prox.proximityLevel, 300)
+
+
+def checkGesture(c):
+    """Swipes are classified from the U/D and L/R ratio changes"""
+    swipes = (
+        ('up', [(50 + k * 15, 200 - k * 15, 120, 120) for k in range(10)], gesture.GESTURE_UP),
+        ('down', [(200 - k * 15, 50 + k * 15, 120, 120) for k in range(10)], gesture.GESTURE_DOWN),
+        ('left', [(120, 120, 50 + k * 15, 200 - k * 15) for k in range(10)], gesture.GESTURE_LEFT),
+        ('right', [(120, 120, 200 - k * 15, 50 + k * 15) for k in range(10)], gesture.GESTURE_RIGHT),
+    )
+    for name, datasets, expected in swipes:
+        sim = APDS9960Sim(proximity=100)
+        d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+        d.gesture.setThreshold(enter=40, exit=30, eFifoThreshold=0)
+        d.gesture.enableSensor()
+        sim.loadGesture(datasets + [(0, 0, 0, 0)])
+        found = []
+        for i in range(8):
+            sim.advance(sim.cycleMs())
+            g = d.gesture.readGesture()
+            if g:
+                found.append(g)
+        c.equal(name, found, [expected])
+
+    # Read on the FIFO interrupt (4 datasets), the last datasets stay below the FIFO level
+    for tail in ([], [(0, 0, 0, 0)]):
+        for name, datasets, expected in swipes:
+            sim = APDS9960Sim(proximity=100)
+            d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+            d.gesture.setThreshold(enter=40, exit=30, eFifoThreshold=1)
+            d.gesture.enableInterrupt()
+            d.gesture.enableSensor()
+            sim.loadGesture(datasets + tail)
+            found = []
+            for i in range(8):
+                sim.advance(sim.cycleMs())
+                if sim.pin.value() == 0 or d.gesture.active:
+                    g = d.gesture.readGesture()
+                    if g:
+                        found.append(g)
+            c.equal('%s on INT%s' % (name, ', zero tail' if tail else ''), found, [expected])
+
+
+def checkProximityEvents(c):
+    """ProximityEvents reports enter / hover / leave and re-arms the thresholds"""
+    ticks = [0]
+    clock = apds9960LITE.ticks_us, events.ticks_us
+    apds9960LITE.ticks_us = events.ticks_us = lambda: ticks[0]
+    try:
+        wave = [0] * 5 + [100] * 10 + [10] * 5 + [80] * 3 + [20] * 5
+        sim = APDS9960Sim(proximity=wave)
+        d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+        d.prox.enableSensor()
+        e = events.ProximityEvents(d, sim.pin, enter=50, leave=30, hover_ms=5, persistance=2)
+        c.equal('armed above enter (PILT, PIHT, PPERS)', (sim.regs[0x89], sim.regs[0x8B], sim.regs[0x8C] >> 4),
+                (0, 50, 2))
+        found = []
+        for k in range(len(wave) + 2):
+            ticks[0] += 1000
+            sim.advance(1)
+            while True:
+                event = e.pop()
+                if event is None:
+                    break
+                found.append(event[1:])
+            if k == 6:
+                c.equal('armed below leave (PILT, PIHT)', (sim.regs[0x89], sim.regs[0x8B]), (30, 255))
+        c.equal('events', found, [(events.EVENT_ENTER, 100), (events.EVENT_HOVER, 100), (events.EVENT_LEAVE, 10),
+                                  (events.EVENT_ENTER, 80), (events.EVENT_LEAVE, 20)])
+        e.close()
+        c.equal('close, PIEN off', sim.regs[0x80] & 0x20, 0)
+    finally:
+        apds9960LITE.ticks_us, events.ticks_us = clock
+
+
+def checkInterrupt(c):
+    """attachInterrupt() services an already asserted INT and pollInterrupt() a missed one"""
+    sim = APDS9960Sim(proximity=100)
+    d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+    d.prox.enableSensor()
+    d.prox.setInterruptThreshold(high=10, low=0, persistance=0)
+    d.prox.enableInterrupt()
+    sim.advance(1)
+    c.equal('INT low before attaching', sim.pin.value(), 0)
+    d.attachInterrupt(sim.pin)
+    c.equal('serviced on attach', d.samples.pop()[1:], (apds9960LITE.CHANNEL_PROX, 100))
+    c.equal('INT released', sim.pin.value(), 1)
+
+    def full(func, arg):
+        raise RuntimeError('schedule queue full')
+    schedule = apds9960LITE.schedule
+    apds9960LITE.schedule = full
+    try:
+        sim.advance(1)
+    finally:
+        apds9960LITE.schedule = schedule
+    c.equal('schedule failed, no sample', (sim.pin.value(), len(d.samples)), (0, 0))
+    c.equal('pollInterrupt()', d.pollInterrupt()[1:], (apds9960LITE.CHANNEL_PROX, 100))
+    c.equal('INT released by pollInterrupt()', sim.pin.value(), 1)
+    c.equal('pollInterrupt() nothing pending', d.pollInterrupt(), None)
+
+    # prox.clearInterrupt() releases INT for the proximity and the light interrupt
+    sim = APDS9960Sim(proximity=100, light=(500, 0, 0, 0))
+    d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+    d.prox.enableSensor()
+    d.als.enableSensor()
+    d.prox.setInterruptThreshold(high=10, low=0, persistance=0)
+    d.als.setInterruptThreshold(high=100, low=0, persistance=0)
+    d.prox.enableInterrupt()
+    d.als.enableInterrupt()
+    sim.advance(sim.cycleMs())
+    c.equal('PINT and AINT set', sim.regs[0x93] & 0x30, 0x30)
+    d.prox.clearInterrupt()
+    c.equal('prox.clearInterrupt() releases INT', (sim.regs[0x93] & 0x30, sim.pin.value()), (0, 1))
+
+
+def checkPersistance(c):
+    """setInterruptThreshold() only changes its own PERS field"""
+    sim = APDS9960Sim()
+    d = apds9960LITE.APDS9960LITE(SimI2C(sim))
+    d.prox.persistance = 15
+    d.als.persistance = 15
+    d.prox.setInterruptThreshold(persistance=2)
+    c.equal('PPERS=2, APERS kept', sim.regs[0x8C], 0x2F)
+    d.als.setInterruptThreshold(persistance=9)
+    c.equal('APERS=7 (limited), PPERS kept', sim.regs[0x8C], 0x27)
+    d.prox.setInterruptThreshold(persistance=0)
+    c.equal('PPERS=0, APERS kept', sim.regs[0x8C], 0x07)
+
+    sim9900 = APDS9900Sim()
+    d9900 = apds9900LITE.APDS9900LITE(SimI2C(sim9900))
+    d9900.als.persistance = 15
+    d9900.prox.setInterruptThreshold(high=500, low=100, persistance=5)
+    c.equal('APDS9900 PPERS=5, APERS kept', sim9900.regs[0x0C], 0x5F)
+
+
+CHECKS = (checkRGBC, checkConfigure, checkNestedConfigure, checkGesture, checkProximityEvents,
+          checkInterrupt, checkPersistance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('-v', '--verbose', action='store_true', help='list the passed values')
+    args = parser.parse_args(argv)
+
+    c = Checker(args.verbose)
+    for check in CHECKS:
+        c.check = check.__name__
+        try:
+            check(c)
+        except Exception as e:
+            c.failed.append(check.__name__)
+            print('FAIL  %s: %s: %s' % (check.__name__, type(e).__name__, e))
+
+    if c.failed:
+        print('%d check(s) failed, %d passed' % (len(c.failed), c.passed))
+        return 1
+    print('All %d checks passed' % c.passed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""`logreader`
+====================================================
+
+Host side reader of the binary logs written by uPy_APDS9960/datalog.py.
+The file is memory mapped and the records are decoded column by column into arrays.
+
+    python tools/logreader.py trace.bin            # Summary
+    python tools/logreader.py trace.bin --csv      # CSV to stdout
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    import sys
+    sys.path.insert(0,'tools')
+    from logreader import readLog
+
+    log = readLog('trace.bin')
+    print(log['ms'][-1], max(log['prox']))
+"""
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'APDL'
+HEADER = struct.Struct('<4sBBHI4x')
+LOG_PROX = 0x01
+LOG_RGBC = 0x02
+GAP = 0xFFFF
+
+
+def readLog(path):
+    """Decodes a log file.
+
+    :returns: dict with the header fields (version, channels, start) and the columns as arrays:
+              ms (time since the log was opened, gaps count as 65535 ms), gap (1 when the
+              delta was 65535 ms or more) and prox or clear / red / green / blue
+    """
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < HEADER.size:
+                raise ValueError('%s: too short for a log header' % path)
+            magic, version, channels, size, start = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError('%s: not an APDS log (magic %r)' % (path, magic))
+            if version != 1:
+                raise ValueError('%s: unsupported log version %d' % (path, version))
+            words = size // 2
+            n = (len(mm) - HEADER.size) // size
+            data = array('H')
+            data.frombytes(mm[HEADER.size:HEADER.size + n * size])
+    if sys.byteorder != 'little':
+        data.byteswap()
+
+    names = []
+    if channels & LOG_PROX:
+        names.append('prox')
+    if channels & LOG_RGBC:
+        names.extend(('clear', 'red', 'green', 'blue'))
+    log = {'version': version, 'channels': channels, 'start': start}
+    deltas = data[0::words]
+    t = 0
+    ms = array('Q', bytes(8 * n))
+    gap = array('B', bytes(n))
+    for i, d in enumerate(deltas):
+        t += d
+        ms[i] = t
+        if d == GAP:
+            gap[i] = 1
+    log['ms'] = ms
+    log['gap'] = gap
+    for k, name in enumerate(names):
+        log[name] = data[k + 1::words]
+    return log
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('file')
+    parser.add_argument('--csv', action='store_true', help='write all records as CSV')
+    args = parser.parse_args(argv)
+
+    log = readLog(args.file)
+    columns = [c for c in ('prox', 'clear', 'red', 'green', 'blue') if c in log]
+    n = len(log['ms'])
+    if args.csv:
+        print(','.join(['ms', 'gap'] + columns))
+        for i in range(n):
+            print(','.join(str(log[c][i]) for c in ['ms', 'gap'] + columns))
+        return 0
+    print('%s: %d records, %s' % (args.file, n, ', '.join(columns)))
+    if n:
+        print('duration %d ms, %d gap(s)' % (log['ms'][-1], sum(log['gap'])))
+        for c in columns:
+            col = log[c]
+            print('%-6s min %5d max %5d mean %.1f' % (c, min(col), max(col), sum(col) / n))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,24 +9,408 @@ Low memory Driver class for the APDS9960
     https://www.gnu.org/licenses/gpl-3.0.html
 """
 from time import sleep
-from micropython import const
+try:
+    from time import ticks_us, ticks_ms, ticks_diff, ticks_add, sleep_ms
+except ImportError:                     # CPython (host side simulation), shared by the other modules
+    from time import perf_counter_ns
+    def ticks_us():
+        return (perf_counter_ns()//1000) & 0x3fffffff
+    def ticks_ms():
+        return (perf_counter_ns()//1000000) & 0x3fffffff
+    def ticks_diff(a,b):
+        return ((a-b+0x20000000) & 0x3fffffff)-0x20000000
+    def ticks_add(a,b):
+        return (a+b) & 0x3fffffff
+    def sleep_ms(ms):
+        sleep(ms/1000)
+try:
+    from micropython import const, schedule
+except ImportError:                     # CPython (host side simulation)
+    def const(x):
+        return x
+    def schedule(func,arg):
+        func(arg)
 #APDS9960_ADDR        = const(0x39)
 
+# Sample channels stored in SampleRing by APDS9960LITE.attachInterrupt()
+CHANNEL_PROX = const(1)
+CHANNEL_ALS  = const(2)
+CHANNEL_RGBC = const(3)   # Clear, red, green and blue (SampleRing width 4)
+
+def _signMagnitude(val):
+    """POFFSET register (bit 7 sign, bits 6:0 magnitude) to int"""
+    return -(val & 0x7f) if val & 0x80 else val
+
+def _toSignMagnitude(offset):
+    """int (-127 - 127) to POFFSET register"""
+    offset=min(127,max(-127,offset))
+    return 0x80|-offset if offset<0 else offset
+
+# Timing presets for APDS9960LITE.setTiming(): (ALS integration time ms, wait time ms)
+TIMING_PRESETS = {
+    'max rate':         (2.78, 0),      # Shortest cycle, ALS resolution 1025 counts
+    'low power':        (27.8, 1000),   # ~1 sample per second, long wait (WLONG) between cycles
+    'high sensitivity': (711.68, 0),    # Longest ALS integration, resolution 65535 counts
+}
+
+# Timing presets for the APDS9900 (2.72 ms steps)
+TIMING_PRESETS_9900 = {
+    'max rate':         (2.72, 0),      # Shortest cycle, ALS resolution 1024 counts
+    'low power':        (27.2, 1000),   # ~1 sample per second, long wait (WLONG) between cycles
+    'high sensitivity': (696.32, 0),    # Longest ALS integration, resolution 65535 counts
+}
+
+class RegisterMap:
+    """Register layout of a supported chip, the device core (:class:`I2CEX`) and the engines 
+    take every chip dependent address and scale from it.
+
+    The APDS9900 is accessed through a command byte (CMD 0x80 | register), so its register 
+    addresses are given as command bytes and then match the APDS9960 layout: 
+    ENABLE 0x80 - CONTROL 0x8F, ID 0x92, STATUS 0x93, CDATA 0x94 and the interrupt clears 0xE5 - 0xE7.
+    """
+    __slots__=('name','ids','burst','command','pilt','piht','pdata','proxMax',
+               'cacheEnd','cacheHigh','stepMs','counts','proxMs','presets')
+
+    def __init__(self,name,ids,burst,command,pilt,piht,pdata,proxMax,
+                 cacheEnd,cacheHigh,stepMs,counts,proxMs,presets):
+        self.name=name
+        self.ids=ids              # ID register (0x92) values
+        self.burst=burst          # Or'ed into the register of multi-byte transfers (auto-increment)
+        self.command=command      # Interrupt clears are special function command bytes
+        self.pilt=pilt            # Proximity interrupt thresholds
+        self.piht=piht
+        self.pdata=pdata          # Proximity data
+        self.proxMax=proxMax      # Proximity full scale, above 255 the data and thresholds are 16 bit
+        self.cacheEnd=cacheEnd    # Register cache: 0x80 - cacheEnd and 0x9D - cacheHigh
+        self.cacheHigh=cacheHigh
+        self.stepMs=stepMs        # ATIME / WTIME step
+        self.counts=counts        # ALS counts per integration step
+        self.proxMs=proxMs        # Proximity cycle time, None: given by PTIME (0x82)
+        self.presets=presets      # setTiming() presets
+
+APDS9960_MAP = RegisterMap('APDS9960',(0xAB,0xA8),0x00,False,0x89,0x8B,0x9C,255,
+                           0x90,0xAA,2.78,1025,0.7,TIMING_PRESETS)
+"""APDS9960 register map"""
+APDS9900_MAP = RegisterMap('APDS9900',(0x29,0x20),0x20,True,0x88,0x8A,0x98,1023,
+                           0x8F,0x00,2.72,1024,None,TIMING_PRESETS_9900)
+"""APDS9900 / APDS9901 register map (command byte addresses)"""
+
+class RegField:
+    """Register bit field descriptor, declared once per field in the engine / driver class.
+    Reads and writes go through the device core (obj._dev) so the register cache and 
+    configure() transactions apply. Full byte fields are written without reading the register.
+
+    :param reg: The register
+    :type reg: int
+
+    :param shift: Position of the lowest bit of the field (Default 0)
+    :type shift: int
+
+    :param width: Number of bits (Default 8)
+    :type width: int
+
+    :example:
+      .. code:: python
+
+        class PROX:
+            pulseLength = RegField(0x8e,6,2)    # PPULSE<7:6>, 4 - 32 us
+
+        apds9960.prox.pulseLength=3             # One read-modify-write of PPULSE
+    """
+    __slots__=('reg','shift','mask')
+
+    def __init__(self,reg,shift=0,width=8):
+        self.reg=reg
+        self.shift=shift
+        self.mask=((1<<width)-1)<<shift
+
+    def __get__(self,obj,cls=None):
+        if obj is None:
+            return self
+        return (obj._dev._readByte(self.reg) & self.mask)>>self.shift
+
+    def __set__(self,obj,val):
+        if self.mask==0xff:
+            obj._dev._writeByte(self.reg,val)
+        else:
+            obj._dev._regUpdate(self.reg,self.mask,val<<self.shift)
+
+class LazyEngine:
+    """Engine attribute of the driver created on first access, the objects of engines that are not used
+    take no RAM. The engine is stored in the driver instance, later accesses are plain attribute lookups.
+    The classes stay in this module except the gesture engine (uPy_APDS9960/gesture.py), the optional
+    features are modules imported on first use (light, calibration, samplering and i2cstats).
+
+    :param name: The attribute name
+    :type name: str
+
+    :param factory: The engine class, or a function importing it, called with the driver
+    :type factory: function
+    """
+    __slots__=('name','factory')
+
+    def __init__(self,name,factory):
+        self.name=name
+        self.factory=factory
+
+    def __get__(self,obj,cls=None):
+        if obj is None:
+            return self
+        engine=self.factory(obj)
+        setattr(obj,self.name,engine)     # Shadows this descriptor
+        return engine
+
+def _newGesture(dev):
+    from uPy_APDS9960.gesture import GESTURE
+    return GESTURE(dev)
+
+def detect(i2c,address=0x39):
+    """Identifies the sensor from the ID register (0x92, the APDS9900 ID register 0x12 read 
+    through its command byte)
+
+    :param i2c: The I2C driver
+    :type i2C: machine.i2c
+
+    :param address: The I2C address of the device (Default 0x39)
+    :type address: int
+
+    :returns: APDS9960_MAP or APDS9900_MAP
+    :rtype: RegisterMap
+    """
+    id=i2c.readfrom_mem(address,0x92,1)[0]
+    for regmap in (APDS9960_MAP,APDS9900_MAP):
+        if id in regmap.ids:
+            return regmap
+    raise OSError("Unknown sensor ID 0x%02x" % id)
+
+def openSensor(i2c,cache=False,powerUp=True):
+    """Creates the driver of the connected sensor (APDS9960LITE or APDS9900LITE), see :func:`detect`
+
+    :param i2c: The I2C driver
+    :type i2C: machine.i2c
+
+    :returns: The driver
+    :rtype: APDS9960LITE
+
+    :example:
+      .. code:: python
+
+        from uPy_APDS9960.apds9960LITE import openSensor
+
+        apds=openSensor(i2c)              # APDS9960 or APDS9900
+        apds.prox.enableSensor()
+        print(apds._map.name, apds.prox.proximityLevel)
+    """
+    if detect(i2c) is APDS9900_MAP:
+        from uPy_APDS9900.apds9900LITE import APDS9900LITE
+        return APDS9900LITE(i2c,cache,powerUp)
+    return APDS9960LITE(i2c,cache,powerUp)
+
 class I2CEX:
     """micropython i2c adds functions for reading / writing byte to a register 
 
+    I2CEX is the device core: it owns the bus handle, the address, the scratch buffers and
+    the register cache. The sensor engines (:class:`.PROX`, :class:`.ALS`, :class:`uPy_APDS9960.gesture.GESTURE`)
+    are lightweight views that do all register access through the core of their device.
+    The chip differences (APDS9960 / APDS9900) are given by the register map.
+
     :param i2c: The I2C driver
     :type i2C: machine.i2c
+
+    :param address: The I2C address of the device
+    :type address: int
+
+    :param cache: Optional write-through shadow copy of the configuration registers
+                  (see :meth:`newCache`) used by all engines of the device.
+                  (Default None, all reads goes to the I2C bus)
+    :type cache: bytearray
+
+    :param regmap: The chip register map (Default APDS9960_MAP)
+    :type regmap: RegisterMap
     """
 
     def __init__(self,
                  i2c, 
-                 address):
+                 address,
+                 cache=None,
+                 regmap=APDS9960_MAP):
         self.__i2c=i2c
         self.__address=address
-        
-    def __regWriteBit(self,reg,bitPos,bitVal):
+        self.__cache=cache
+        self._map=regmap
+        self._dev=self            # RegField access, the core is its own device
+        self._burst=regmap.burst  # Auto-increment bit of multi-byte transfers
+        self.__cacheEnd=regmap.cacheEnd
+        self.__cacheHigh=regmap.cacheHigh
+        self.__buf1=bytearray(1)  # Scratch buffers reused by every register access
+        self.__buf2=bytearray(2)  # (no heap allocation in the read / write path)
+        self._scratch=bytearray(8) # Burst read buffer shared by the engines (RGBC)
+        self.__dirty=None          # Registers changed in the open configure() transaction
+        self.__ownCache=False      # Cache allocated only for the transaction
+        self.__depth=0             # Nesting level of configure() blocks
+        self.__stats=None          # I2CStats proxy while enableStats() is on
+
+    @staticmethod
+    def newCache():
+        """Allocates a shadow register cache for the configuration registers
+        ENABLE (0x80) - CONFIG2 (0x90) and POFFSET_UR (0x9D) - GCONF3 (0xAA)
+
+        The cache is filled from the device by :meth:`resync`
+
+        :returns: cache buffer to be given to the I2CEX constructor
+        :rtype: bytearray
+        """
+        return bytearray(0x2B)   # 0x80 - 0xAA
+
+    def _cached(self,reg):
+        """Returns True if the register is shadowed by the register cache
+        (Data, status and interrupt clear registers are never cached)
+        """
+        return self.__cache is not None and (0x80 <= reg <= self.__cacheEnd or 0x9D <= reg <= self.__cacheHigh)
+
+    def resync(self):
+        """Reloads the register cache from the device (two burst reads)
+        Call it if the device has been reset or written to by others.
+        """
+        cache=self.__cache
+        if cache is None:
+            return
+        mv=memoryview(cache)
+        burst=self._burst
+        self.__i2c.readfrom_mem_into(self.__address,0x80|burst,mv[0x00:self.__cacheEnd-0x7F]) # ENABLE  - CONFIG2
+        if self.__cacheHigh:
+            self.__i2c.readfrom_mem_into(self.__address,0x9D|burst,mv[0x1D:self.__cacheHigh-0x7F]) # POFFSET - GCONF3
+
+    def enableStats(self,on=True,retries=0):
+        """Enables/Disables bus instrumentation (see :meth:`stats`).
+        When disabled the I2C driver is used directly and the instrumentation costs nothing.
+
+        :param on: Enables / Disables the instrumentation (Default True)
+        :type on: bool
+
+        :param retries: Number of times a NACKed (OSError) transaction is retried (Default 0)
+        :type retries: int
+        """
+        i2c=self.__i2c
+        if self.__stats is not None:
+            i2c=self.__stats.i2c
+        self.__stats=None
+        if on:
+            from uPy_APDS9960.i2cstats import I2CStats   # Loaded on first use
+            i2c=self.__stats=I2CStats(i2c,retries)
+        self.__i2c=i2c
+
+    def stats(self):
+        """Returns the bus statistics collected since :meth:`enableStats` 
+
+        :returns: None when disabled, otherwise a dict with the keys
+                  reads, writes, bytes, busUs (total time on the bus), maxReadUs, maxWriteUs,
+                  errors (OSError/NACK), retries and registers ({reg: [reads, writes]})
+        :rtype: dict
+
+        :example:
+          .. code:: python
+
+            apds9960.enableStats()
+            ...
+            s=apds9960.stats()
+            print(s['busUs'], s['registers'])
+        """
+        i2c=self.__stats
+        if i2c is None:
+            return None
+        return {'reads':i2c.reads, 'writes':i2c.writes, 'bytes':i2c.bytes, 'busUs':i2c.busUs,
+                'maxReadUs':i2c.maxReadUs, 'maxWriteUs':i2c.maxWriteUs, 
+                'errors':i2c.errors, 'retries':i2c.retried, 'registers':i2c.registers}
+
+    def resetStats(self):
+        """Clears the bus statistics"""
+        if self.__stats is not None:
+            self.__stats.reset()
+
+    def configure(self):
+        """Collects configuration changes and writes them in as few I2C transactions as possible.
+        Inside the with block register writes only update the register cache, on exit the 
+        changed registers are merged into contiguous multi-byte writes. ENABLE (0x80) is written last
+        so the engines start with the new configuration. 
+        If the with block raises an exception no changes are written and the cache is reloaded.
+        configure() blocks can be nested (ex. setTiming() inside a with block), 
+        the changes are written when the outermost block exits.
+
+        Without the register cache enabled a temporary cache is filled with burst reads (see :meth:`resync`).
+
+        :returns: The device, to be used in a with statement
+        :rtype: I2CEX
+
+        :example:
+          .. code:: python
+
+            with apds9960.configure():
+                apds9960.prox.eLEDCurrent=0
+                apds9960.prox.eProximityGain=3
+                apds9960.prox.enableSensor()
+                apds9960.prox.setInterruptThreshold(high=10,low=0,persistance=7)
+                apds9960.prox.enableInterrupt()
+        """
+        return self
+
+    def __enter__(self):
+        if self.__depth==0:        # Outermost block opens the transaction
+            if self.__cache is None:
+                self.__cache=self.newCache()
+                try:
+                    self.resync()
+                    self.__ownCache=True
+                finally:
+                    if not self.__ownCache:    # Bus error, the partly read cache is not kept
+                        self.__cache=None
+            self.__dirty=bytearray(len(self.__cache))
+        self.__depth+=1            # Only counted once the transaction is open
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.__depth-=1
+        if self.__depth:           # Inner block, the outermost block commits
+            return False
+        dirty=self.__dirty
+        self.__dirty=None
+        try:
+            if exc_type is None:
+                self.__commit(dirty)
+            elif not self.__ownCache:
+                self.resync()      # Drop the uncommitted changes 
+        finally:
+            if self.__ownCache:    # Dropped even if the commit fails
+                self.__cache=None
+                self.__ownCache=False
+        return False
+
+    def __commit(self,dirty):
+        """Writes the dirty registers, bridging gaps of up to two unchanged registers
+        (rewriting an unchanged register with its cached value is cheaper than a new transaction)
+        """
+        mv=memoryview(self.__cache)
+        n=self.__cacheHigh-0x7F if self.__cacheHigh else self.__cacheEnd-0x7F
+        i=1                        # ENABLE (index 0) is written last
+        while i<n:
+            if not dirty[i]:
+                i+=1
+                continue
+            start=i
+            end=i+1
+            i+=1
+            while i<n and i-end<=2:
+                if dirty[i]:
+                    end=i+1
+                i+=1
+            self.__i2c.writeto_mem(self.__address,(0x80+start)|self._burst,mv[start:end])
+            i=end
+        if dirty[0]:
+            self.__i2c.writeto_mem(self.__address,0x80,mv[0:1])
+
+    def _regWriteBit(self,reg,bitPos,bitVal):
         """Reads a I2C register byte changes a bit and writes the new value
+           (the read is served by the register cache when enabled)
 
             :param reg: The I2C register that is writen to
             :type reg: int
@@ -37,16 +421,31 @@ class I2CEX:
             :param value: True = set-bit / False =clear bit
             :type value: bool        
         """
-        val=self.__readByte(reg)   # read reg 
+        val=self._readByte(reg)   # read reg 
         if bitVal == True:
             val=val | (1<<bitPos)  # set bit
         else:
             val=val & ~(1<<bitPos) # clear bit
         
-        self.__writeByte(reg,val) #write reg
+        self._writeByte(reg,val) #write reg
+
+    def _regUpdate(self,reg,mask,val):
+        """Reads a I2C register byte, replaces the masked bits and writes the new value
+           (updates several bits of ex. ENABLE with one write)
+
+            :param reg: The I2C register that is writen to
+            :type reg: int
+
+            :param mask: The bits to change
+            :type mask: int        
+            
+            :param val: The new value of the masked bits
+            :type val: int        
+        """
+        self._writeByte(reg,(self._readByte(reg) & ~mask) | (val & mask))
   
     
-    def __writeByte(self,reg,val):
+    def _writeByte(self,reg,val):
         """Writes a I2C byte to the address APDS9960_ADDR (0x39)
 
             :param reg: The I2C register that is writen to
@@ -54,9 +453,17 @@ class I2CEX:
             :param val: The I2C value to write in the range (0- 255)
             :type val: int        
         """
-        self.__i2c.writeto_mem(self.__address,reg,bytes((val,)))
+        if self.__dirty is not None and self._cached(reg):
+            self.__cache[reg-0x80]=val & 0xff   # Written by the configure() commit
+            self.__dirty[reg-0x80]=1
+            return
+        b=self.__buf1
+        b[0]=val & 0xff
+        self.__i2c.writeto_mem(self.__address,reg,b)
+        if self._cached(reg):
+            self.__cache[reg-0x80]=b[0]
 
-    def __readByte(self,reg):
+    def _readByte(self,reg):
         """Reads a I2C byte from the address APDS9960_ADDR (0x39)
 
         :param reg: The I2C register to read
@@ -65,11 +472,14 @@ class I2CEX:
         :returns: a value in the range (0- 255)
         :rtype: int      
         """
+        if self._cached(reg):
+            return self.__cache[reg-0x80]
 
-        val =self.__i2c.readfrom_mem(self.__address,reg, 1)
-        return int.from_bytes(val, 'big', True)
+        b=self.__buf1
+        self.__i2c.readfrom_mem_into(self.__address,reg,b)
+        return b[0]
 
-    def __write2Byte(self,reg,val):
+    def _write2Byte(self,reg,val):
         """Writes a I2C byte to the address APDS9960_ADDR (0x39)
 
             :param reg: The I2C register that is writen to
@@ -77,12 +487,20 @@ class I2CEX:
             :param val: The I2C value to write in the range (0- 255)
             :type val: int        
         """
-        b = bytearray(2)
+        if self.__dirty is not None and self._cached(reg) and self._cached(reg+1):
+            self._writeByte(reg,val)
+            self._writeByte(reg+1,val>>8)
+            return
+        b=self.__buf2
         b[0]=val & 0xff
         b[1]=(val>>8) & 0xff
-        self.__i2c.writeto_mem(self.__address,reg,b)
+        self.__i2c.writeto_mem(self.__address,reg|self._burst,b)
+        if self._cached(reg):
+            self.__cache[reg-0x80]=b[0]
+        if self._cached(reg+1):
+            self.__cache[reg-0x7F]=b[1]
 
-    def __read2Byte(self,reg):
+    def _read2Byte(self,reg):
         """Reads a I2C byte from the address APDS9960_ADDR (0x39)
 
         :param reg: The I2C register to read
@@ -91,20 +509,58 @@ class I2CEX:
         :returns: a value in the range (0- 65535)
         :rtype: int      
         """
-        val =self.__i2c.readfrom_mem(self.__address,reg, 2)
-        return int.from_bytes(val, 'little', True)
+        b=self.__buf2
+        self.__i2c.readfrom_mem_into(self.__address,reg|self._burst,b)
+        return b[0] | (b[1]<<8)
+
+    def _readInto(self,reg,buf):
+        """Reads len(buf) bytes starting at the register (auto-increment burst read)
+
+        :param reg: The first I2C register to read
+        :type reg: int
+
+        :param buf: The preallocated buffer that is filled
+        :type buf: bytearray
+        """
+        self.__i2c.readfrom_mem_into(self.__address,reg|self._burst,buf)
+
+    def _special(self,reg):
+        """Address accessed interrupt clear (0xE5 proximity, 0xE6 ALS, 0xE7 all non-gesture).
+        The APDS9900 clears with a special function command byte, the APDS9960 on a register read.
+
+        :param reg: The clear register / command byte
+        :type reg: int
+        """
+        b=self.__buf1
+        if self._map.command:
+            b[0]=reg
+            self.__i2c.writeto(self.__address,b)
+        else:
+            self.__i2c.readfrom_mem_into(self.__address,reg,b)
+
+    def _readProximity(self):
+        """Reads the proximity data (PDATA, 16 bit on the APDS9900)
+
+        :returns: The proximity level
+        :rtype: int
+        """
+        m=self._map
+        if m.proxMax>255:
+            return self._read2Byte(m.pdata)
+        return self._readByte(m.pdata)
    
   
     
-class ALS(I2CEX):
+class ALS:
     """APDS9960 Digital Ambient Light Sense (ALS) and Color Sense (RGBC) functionalities 
-    
-    :param i2c: The I2C driver
-    :type i2C: machine.i2c
+
+    :param dev: The device core (bus, address, buffers and register cache) shared by all engines
+    :type dev: I2CEX
     """    
     def __init__(self,
-                 i2c):
-        super().__init__(i2c,0x39) # initiate I2CEX with APDS9960_ADDR
+                 dev):
+        self._dev=dev
+        self.__range=None      # Auto-range state (light.AutoRange), see enableAutoRange()
 
     def enableSensor(self,on=True):
         """Enable/Disable the Light sensor
@@ -114,39 +570,26 @@ class ALS(I2CEX):
         :type on: bool
         """
         AEN=1  #ALS enable bit 1 (AEN) in reg APDS9960_REG_ENABLE
-        super().__regWriteBit(reg=0x80,bitPos=AEN,bitVal=on)
+        self._dev._regWriteBit(reg=0x80,bitPos=AEN,bitVal=on)
 
-    @property
-    def eLightGain(self):
-        """Sets the receiver gain for light measurements.
+    eLightGain = RegField(0x8f,0,2)
+    """Receiver gain for light measurements (CONTROL AGAIN<1:0>) (0 - 3)
 
-        :getter: Returns the reciever gain (0 -3)
-        :setter: Sets the reciever gain (0 -3)
-        :type: int
+    ::
 
-        ::
-
-            eGain    Gain
-              0       1x
-              1       2x
-              2       16x
-              3       64x
-        """
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)
-        val= val  & 0b00000011 
-        return val
+        eGain    Gain    APDS9900
+          0       1x      1x
+          1       4x      8x
+          2       16x     16x
+          3       64x     120x
+    """
 
-    @eLightGain.setter
-    def eLightGain(self, eGain):
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)
-        # set bits in register to given value
-        eGain &= 0b00000011
-        val &= 0b11111100
-        val |= eGain
+    persistance = RegField(0x8c,0,4)
+    """ALS interrupt persistence (PERS APERS<3:0>), 0: every cycle, 1 - 3: 1 - 3 cycles, 
+    4 - 15: 5 - 60 cycles (5 cycle steps) out of range before the interrupt is raised"""
 
-        super().__writeByte(0x8f,val)
+    saturationInterrupt = RegField(0x90,6,1)
+    """Clear photodiode saturation interrupt enable (CONFIG2 CPSIEN<6>, APDS9960)"""
 
 
     @property
@@ -156,7 +599,7 @@ class ALS(I2CEX):
             :getter: Returns the ambient light level (0 - 1025 ) 
             :type: int     
         """
-        return super().__read2Byte(0x94) #returns CDATAL and CDATAH
+        return self._dev._read2Byte(0x94) #returns CDATAL and CDATAH
 
     @property
     def redLightLevel(self):
@@ -165,7 +608,7 @@ class ALS(I2CEX):
             :getter: Returns the red light level (0 - 1025 ) 
             :type: int     
         """ 
-        return super().__read2Byte(0x96) #returns RDATAL and RDATAH
+        return self._dev._read2Byte(0x96) #returns RDATAL and RDATAH
     
     @property
     def greenLightLevel(self):
@@ -174,7 +617,7 @@ class ALS(I2CEX):
             :getter: Returns the green light level (0 - 1025 ) 
             :type: int     
         """       
-        return super().__read2Byte(0x98) #returns GDATAL and GDATAH
+        return self._dev._read2Byte(0x98) #returns GDATAL and GDATAH
     
     @property
     def blueLightLevel(self):
@@ -183,7 +626,155 @@ class ALS(I2CEX):
             :getter: Returns the blue light level (0 - 1025 ) 
             :type: int     
         """       
-        return super().__read2Byte(0x9A) #returns BDATAL and BDATAH
+        return self._dev._read2Byte(0x9A) #returns BDATAL and BDATAH
+
+    def readRGBC(self,buf=None):
+        """Reads the clear, red, green and blue channel data with one 8 byte burst read (0x94 - 0x9B).
+        All four channels are from the same integration cycle.
+
+        :param buf: Optional preallocated buffer of 4 elements (ex. array('H',(0,0,0,0))) 
+                    that is filled with clear, red, green and blue (Default None)
+        :type buf: array
+
+        :returns: buf when given otherwise the tuple (clear, red, green, blue) 
+        :rtype: tuple
+
+        :example:
+          .. code:: python
+
+            from array import array
+            rgbc=array('H',(0,0,0,0))        # Allocate once
+            apds9960.als.readRGBC(rgbc)      # rgbc[0]=clear rgbc[1]=red rgbc[2]=green rgbc[3]=blue
+        """
+        b=self._dev._scratch
+        self._dev._readInto(0x94,b)       #CDATAL, CDATAH, RDATAL .. BDATAH
+        if buf is None:
+            return (b[0]|(b[1]<<8), b[2]|(b[3]<<8), b[4]|(b[5]<<8), b[6]|(b[7]<<8))
+        buf[0]=b[0]|(b[1]<<8)
+        buf[1]=b[2]|(b[3]<<8)
+        buf[2]=b[4]|(b[5]<<8)
+        buf[3]=b[6]|(b[7]<<8)
+        return buf
+
+    @property
+    def lux(self):
+        """Illuminance computed from one RGBC readout (DN40 method, IR compensated, integer math).
+        The conversion factors are computed once per gain and integration time.
+
+            :getter: Returns the illuminance in lux
+            :type: int
+        """
+        from uPy_APDS9960.light import lux      # Loaded on first use
+        return lux(self._dev)
+
+    @property
+    def colorTemperature(self):
+        """Correlated colour temperature computed from one RGBC readout (DN40 method, integer math)
+
+            :getter: Returns the colour temperature in Kelvin, 0 when there is no red light
+            :type: int
+        """
+        from uPy_APDS9960.light import colorTemperature
+        return colorTemperature(self._dev)
+
+    def convert(self,rgbc,lux,cct=None):
+        """Converts a buffer of RGBC samples (ex. collected with :meth:`readRGBC`) to lux and 
+        colour temperature. The samples must be read with the current gain and integration time.
+
+        :param rgbc: Samples as clear, red, green, blue, clear, red ... (ex. array('H'))
+        :type rgbc: array
+
+        :param lux: Buffer of len(rgbc)//4 elements filled with the illuminance (ex. array('L'))
+        :type lux: array
+
+        :param cct: Optional buffer of len(rgbc)//4 elements filled with the colour temperature (Default None)
+        :type cct: array
+
+        :example:
+          .. code:: python
+
+            rgbc=array('H',[0]*4*16)
+            lux=array('L',[0]*16)
+            for i in range(16):
+                apds9960.als.readRGBC(memoryview(rgbc)[i*4:i*4+4])
+                sleep_ms(100)
+            apds9960.als.convert(rgbc,lux)
+        """
+        from uPy_APDS9960.light import convert
+        convert(self._dev,rgbc,lux,cct)
+
+    def enableAutoRange(self,on=True):
+        """Enables/Disables automatic gain and integration time for :meth:`readNormalized`.
+        The range is stepped (4x per step) between light cycles when the clear channel is above 90%
+        or below 10% of saturation (1025 counts per 2.78 ms, max 65535). The gain is stepped first 
+        (1x - 64x) then the integration time (1/16 - 16x the current integration time).
+        The current gain and integration time are the starting point.
+
+        :param on: Enables / Disables the auto-range (Default True)
+        :type on: bool
+        """
+        self.__range=None
+        if on:
+            from uPy_APDS9960.light import AutoRange
+            self.__range=AutoRange(self._dev)
+
+    def readNormalized(self,buf=None):
+        """Reads the clear, red, green and blue channels normalised to 64x gain and 100 ms (36 cycles) integration,
+        readings at any gain and integration time are then on the same scale.
+        With :meth:`enableAutoRange` the status and data are read with one 9 byte burst read 
+        and the range is adjusted for the next light cycle.
+
+        :param buf: Optional preallocated buffer of 4 elements (ex. array('L',(0,0,0,0))) 
+                    that is filled with clear, red, green and blue (Default None)
+        :type buf: array
+
+        :returns: buf when given otherwise the tuple (clear, red, green, blue). 
+                  None when the range has just changed and no light cycle has completed with the new range
+        :rtype: tuple
+
+        :example:
+          .. code:: python
+
+            apds9960.als.enableSensor()
+            apds9960.als.enableAutoRange()
+            while True:
+                rgbc=apds9960.als.readNormalized()
+                if rgbc:
+                    print(rgbc)
+                sleep_ms(100)
+        """
+        from uPy_APDS9960.light import readNormalized
+        return readNormalized(self._dev,self.__range,buf)
+
+    def stream(self,rate_hz=10,size=8,pin=None,rgbc=False):
+        """Asynchronous stream of light samples for uasyncio applications.
+        Each new sample (AVALID set or INT pin low) is read once and queued, when the 
+        queue is full the oldest sample is dropped.
+
+        :param rate_hz: How often the sensor is checked for a new sample (Default 10)
+        :type rate_hz: int
+
+        :param size: Number of samples queued for slow consumers (Default 8)
+        :type size: int
+
+        :param pin: Optional pin connected to INT (the interrupt is cleared after each read)
+        :type pin: machine.Pin
+
+        :param rgbc: Stream all four colour channels read with :meth:`readRGBC` (Default False)
+        :type rgbc: bool
+
+        :returns: Async iterator of (ticks_us, CHANNEL_ALS, clear) or 
+                  (ticks_us, CHANNEL_RGBC, clear, red, green, blue) tuples
+        :rtype: SampleStream
+
+        :example:
+          .. code:: python
+
+            async for ticks,channel,c,r,g,b in apds9960.als.stream(rate_hz=5,rgbc=True):
+                print(c,r,g,b)
+        """
+        from uPy_APDS9960.stream import SampleStream
+        return SampleStream(self._dev,CHANNEL_RGBC if rgbc else CHANNEL_ALS,rate_hz,size,pin)
 
     def setInterruptThreshold(self,high=0,low=20,persistance=4):
         """Enable/Disable the proimity sensor
@@ -199,23 +790,17 @@ class ALS(I2CEX):
 
         """
         #ALS low threshold, lower byte
-        super().__write2Byte(0x84, low);  #set ALS low threshold
-        super().__write2Byte(0x86, high); #set ALS low threshold 
+        self._dev._write2Byte(0x84, low);  #set ALS low threshold
+        self._dev._write2Byte(0x86, high); #set ALS low threshold 
  
  
-        if (persistance>7) :
-            persistance=7
-
-        val=super().__readByte(0x8C) #APDS9960_PERS 0x8C<3:0>  Proximity Interrupt Persistence 
-        val=val & 0b11111000          # Clear APERS
-        val=val | persistance         # Set   APERS
-        super().__writeByte(0x8C,val) # Update APDS9960_PERS
+        self.persistance=min(7,persistance)   # APERS 0x8C<3:0>, PPERS is kept
 
     def clearInterrupt(self):
-        """Crears the proimity interrupt
+        """Crears the light interrupt
         IRQ HW output goes low (enables triggering of new IRQ)
         """
-        super().__readByte(0xe6)    #All Non-Gesture Interrupt Clear
+        self._dev._special(0xE6)    #ALS (clear channel) Interrupt Clear
 
     def enableInterrupt(self,on=True):
         """Enables/Disables IRQ dependent on limits given by setLightInterruptThreshold()
@@ -225,19 +810,19 @@ class ALS(I2CEX):
         """
         #ENABLE<AIEN> 0x80<4> ALS Interrupt Enable
         AIEN=4    #ALS Interrupt Enable bit 4 (AIEN) in reg APDS9960_REG_ENABLE
-        super().__regWriteBit(reg=0x80,bitPos=AIEN,bitVal=on)
+        self._dev._regWriteBit(reg=0x80,bitPos=AIEN,bitVal=on)
         self.clearInterrupt(); 
 
 
-class PROX(I2CEX):
+class PROX:
     """APDS9960 proximity functons
 
-    :param i2c: The I2C driver
-    :type i2C: machine.i2c
+    :param dev: The device core (bus, address, buffers and register cache) shared by all engines
+    :type dev: I2CEX
     """    
     def __init__(self,
-                 i2c):
-        super().__init__(i2c,0x39) # initiate I2CEX with APDS9960_ADDR
+                 dev):
+        self._dev=dev
         
     def enableSensor(self,on=True):
         """Enable/Disable the proimity sensor
@@ -248,38 +833,36 @@ class PROX(I2CEX):
         """
          # PEN - bit 2
         PEN=2  #Proximity enable bit 2 (PEN) in reg APDS9960_REG_ENABLE
-        super().__regWriteBit(reg=0x80,bitPos=PEN,bitVal=on)
+        self._dev._regWriteBit(reg=0x80,bitPos=PEN,bitVal=on)
 
     def setInterruptThreshold(self,high=0,low=20,persistance=4):
         """Enable/Disable the proimity sensor
 
-        :param high: high level for generating proximity hardware interrupt (Range 0 - 255)
+        :param high: high level for generating proximity hardware interrupt (Range 0 - 255, APDS9900 0 - 1023)
         :type high: int 
 
-        :param low: low level for generating proximity hardware interrupt (Range 0 - 255)
+        :param low: low level for generating proximity hardware interrupt (Range 0 - 255, APDS9900 0 - 1023)
         :type low: int 
 
         :param persistance: Number of consecutive reads before IRQ is raised (Range 0 - 7)
         :type persistance: int 
 
         """   
-        super().__writeByte(0x89, low);   #set low proximity threshold APDS9960_PILT
-        super().__writeByte(0x8B, high);  #set high proximity threshold APDS9960_PIHT
+        m=self._dev._map
+        if m.proxMax>255:
+            self._dev._write2Byte(m.pilt, low);   #set low proximity threshold PILTL / PILTH
+            self._dev._write2Byte(m.piht, high);  #set high proximity threshold PIHTL / PIHTH
+        else:
+            self._dev._writeByte(m.pilt, low);   #set low proximity threshold APDS9960_PILT
+            self._dev._writeByte(m.piht, high);  #set high proximity threshold APDS9960_PIHT
         
-        if (persistance>7) :
-            persistance=7
-
-        val=super().__readByte(0x8C) #APDS9960_PERS 0x8C<7:4>  Proximity Interrupt Persistence 
-        val=val & 0b00011111          # Clear PERS
-        val=val | (persistance << 4)  # Set   PERS
-        super().__writeByte(0x8C,val) # Update APDS9960_PERS
+        self.persistance=min(7,persistance)   # PPERS 0x8C<7:4>, APERS is kept
         
     def clearInterrupt(self):
-        """Crears the proimity interrupt
+        """Crears the proimity interrupt and the light interrupt (all non-gesture interrupts)
         IRQ HW output goes low (enables triggering of new IRQ)
         """
-        super().__writeByte(0xE7,0) #  APDS9960_AICLEAR clear all interrupts
-        super().__readByte(0xE5)#(APDS9960_PICLEAR)
+        self._dev._special(0xE7)    #(APDS9960_AICLEAR) clear all non-gesture interrupts, PICLEAR included
      
     def enableInterrupt(self,on=True):
         """Enables/Disables IRQ dependent on limits given by setProximityInterruptThreshold()
@@ -288,87 +871,189 @@ class PROX(I2CEX):
         :type on: bool 
         """
         PIEN=5    #Proximity interrupt enable bit 5 (PIEN) in reg APDS9960_REG_ENABLE
-        super().__regWriteBit(reg=0x80,bitPos=PIEN,bitVal=on)
+        self._dev._regWriteBit(reg=0x80,bitPos=PIEN,bitVal=on)
         self.clearInterrupt(); 
 
+    eProximityGain = RegField(0x8f,2,2)
+    """Receiver gain for proximity detection (CONTROL PGAIN<3:2>) (0 - 3)
+
+    ::
+
+        eGain    Gain
+          0       1x
+          1       2x
+          2       4x
+          3       8x
+    """
+
+    eLEDCurrent = RegField(0x8f,6,2)
+    """LED current for proximity and ALS (CONTROL LDRIVE<7:6>) (0 - 3)
+
+    ::
+
+      eCurent  LED Current
+        0        100 mA
+        1         50 mA
+        2         25 mA
+        3         12.5 mA
+    """
+
+    ledBoost = RegField(0x90,4,2)
+    """Additional LED current (CONFIG2 LED_BOOST<5:4>, APDS9960) 0: 100%, 1: 150%, 2: 200%, 3: 300%"""
+
+    pulseLength = RegField(0x8e,6,2)
+    """Proximity LED pulse length (PPLEN, PPULSE 0x8E<7:6>, APDS9960) (0 - 3)
+
+    ::
+
+      ePulse  Pulse length
+        0        4 us
+        1        8 us
+        2       16 us
+        3       32 us
+    """
+
+    persistance = RegField(0x8c,4,4)
+    """Proximity interrupt persistence (PERS PPERS<7:4>), number of consecutive cycles 
+    out of range before the interrupt is raised (0 - 15, 0 every cycle)"""
+
+    saturationInterrupt = RegField(0x90,7,1)
+    """Proximity saturation interrupt enable (CONFIG2 PSIEN<7>, APDS9960)"""
+
+    gainCompensation = RegField(0x9f,5,1)
+    """Proximity gain compensation for masked photodiodes (CONFIG3 PCMP<5>, APDS9960)"""
+
+    photodiodeMask = RegField(0x9f,0,4)
+    """Disabled photodiodes for proximity (CONFIG3 PMASK_U/D/L/R<3:0>, APDS9960), bit 3 up - bit 0 right"""
+
     @property
-    def eProximityGain(self):
-        """Sets the receiver gain for proximity detection.
+    def pulseCount(self):
+        """Number of proximity LED pulses per measurement (PPULSE 0x8E<5:0> + 1).
+        More pulses increase the signal (and the crosstalk).
 
-        :getter: Returns the reciever gain (0 -3)
-        :setter: Sets the reciever gain (0 -3)
+        :getter: Returns the number of pulses (1 - 64)
+        :setter: Sets the number of pulses (1 - 64)
         :type: int
+        """
+        return (self._dev._readByte(0x8e) & 0b00111111)+1
 
-            ::
+    @pulseCount.setter
+    def pulseCount(self, count):
+        self._dev._regUpdate(0x8e,0b00111111,min(64,max(1,count))-1)
 
-                eGain    Gain
-                  0       1x
-                  1       2x
-                  2       4x
-                  3       8x
+    @property
+    def offsetUR(self):
+        """Proximity offset of the up and right photodiodes (POFFSET_UR 0x9D).
+        Positive values remove crosstalk (ex. from a cover glass) from the proximity level.
+
+        :getter: Returns the offset (-127 - 127)
+        :setter: Sets the offset (-127 - 127)
+        :type: int
         """
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)
-        val=((val >>2) & 0b00000011) 
-        return val
- 
-    @eProximityGain.setter
-    def eProximityGain(self, eGain):
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)
-        # set bits in register to given value
-        eGain &= 0b00000011
-        eGain = eGain << 2
-        val &= 0b11110011
-        val |= eGain
-
-        #i2c.writeto_mem(APDS9960_ADDR,APDS9960_REG_CONTROL,bytes((val,)))
-        super().__writeByte(0x8f,val)
+        return _signMagnitude(self._dev._readByte(0x9d))
+
+    @offsetUR.setter
+    def offsetUR(self, offset):
+        self._dev._writeByte(0x9d,_toSignMagnitude(offset))
 
     @property
-    def eLEDCurrent(self):
-        """
-        Sets LED current for proximity and ALS.
+    def offsetDL(self):
+        """Proximity offset of the down and left photodiodes (POFFSET_DL 0x9E).
+        Positive values remove crosstalk (ex. from a cover glass) from the proximity level.
 
-        :getter: Returns the LED current (0 -3)
-        :setter: Sets the LED current(0 -3)
+        :getter: Returns the offset (-127 - 127)
+        :setter: Sets the offset (-127 - 127)
         :type: int
+        """
+        return _signMagnitude(self._dev._readByte(0x9e))
+
+    @offsetDL.setter
+    def offsetDL(self, offset):
+        self._dev._writeByte(0x9e,_toSignMagnitude(offset))
+
+    def calibrate(self,target=0,samples=4,timeout=500):
+        """Finds the smallest offset (:attr:`offsetUR` = :attr:`offsetDL`) that brings the proximity level 
+        to the target with nothing in front of the sensor (binary search, 7 steps). 
+        The proximity engine must be enabled. 
+
+        :param target: Proximity level with nothing in front of the sensor (Default 0)
+        :type target: int
+
+        :param samples: Proximity cycles averaged per step (Default 4)
+        :type samples: int
 
-            ::
+        :param timeout: ms to wait for each proximity cycle (Default 500)
+        :type timeout: int
 
-              eCurent  LED Current
-                0        100 mA
-                1         50 mA
-                2         25 mA
-                3         12.5 mA
+        :returns: The offset
+        :rtype: int
+
+        :example:
+          .. code:: python
+
+            apds9960.prox.enableSensor()
+            try:
+                apds9960.prox.loadCalibration()     # Stored offsets
+            except OSError:
+                apds9960.prox.calibrate()           # Nothing in front of the sensor
+                apds9960.prox.saveCalibration()
         """
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)
-        val=val >>6
-        return val
-  
-       
-    @eLEDCurrent.setter
-    def eLEDCurrent(self, eCurent):
-        #APDS9960_REG_CONTROL = const(0x8f)
-        val=super().__readByte(0x8f)        
-        
-        # set bits in register to given value
-        eCurent &= 0b00000011
-        eCurent = eCurent << 6
-        val &= 0b00111111
-        val |= eCurent
+        from uPy_APDS9960.calibration import calibrate      # Loaded on first use
+        return calibrate(self,target,samples,timeout)
+
+    def saveCalibration(self,filename='apds9960.cal'):
+        """Stores POFFSET_UR and POFFSET_DL in a 2 byte file
+
+        :param filename: The calibration file (Default 'apds9960.cal')
+        :type filename: str
+        """
+        from uPy_APDS9960.calibration import saveCalibration
+        saveCalibration(self._dev,filename)
 
-        super().__writeByte(0x8f,val)
+    def loadCalibration(self,filename='apds9960.cal'):
+        """Writes POFFSET_UR and POFFSET_DL stored by :meth:`saveCalibration` 
+        (raises OSError if the file does not exist)
+
+        :param filename: The calibration file (Default 'apds9960.cal')
+        :type filename: str
+        """
+        from uPy_APDS9960.calibration import loadCalibration
+        loadCalibration(self._dev,filename)
 
     @property
     def proximityLevel(self):
         """Reads the APDS9960 proximity level
 
-            :getter: Returns the proximity level (0 - 255 ) 
+            :getter: Returns the proximity level (0 - 255, APDS9900 0 - 1023 ) 
             :type: int     
         """        
-        return super().__readByte(0x9c)
+        return self._dev._readProximity()
+
+    def stream(self,rate_hz=10,size=8,pin=None):
+        """Asynchronous stream of proximity samples for uasyncio applications.
+        Each new sample (PVALID set or INT pin low) is read once and queued, when the 
+        queue is full the oldest sample is dropped.
+
+        :param rate_hz: How often the sensor is checked for a new sample (Default 10)
+        :type rate_hz: int
+
+        :param size: Number of samples queued for slow consumers (Default 8)
+        :type size: int
+
+        :param pin: Optional pin connected to INT (the interrupt is cleared after each read)
+        :type pin: machine.Pin
+
+        :returns: Async iterator of (ticks_us, CHANNEL_PROX, proximity) tuples
+        :rtype: SampleStream
+
+        :example:
+          .. code:: python
+
+            async for ticks,channel,level in apds9960.prox.stream(rate_hz=20):
+                print(level)
+        """
+        from uPy_APDS9960.stream import SampleStream
+        return SampleStream(self._dev,CHANNEL_PROX,rate_hz,size,pin)
     
 
 class APDS9960LITE(I2CEX) :
@@ -385,24 +1070,74 @@ class APDS9960LITE(I2CEX) :
         
         i2c =  machine.I2C(scl=machine.Pin(5), sda=machine.Pin(4))  # Creates I2C Driver on Pin 5 / 6
         adps9960=APDS9960LITE(i2c)                                  # Create APDS9960 Driver
+
+        adps9960=APDS9960LITE(i2c,cache=True)   # Driver with register cache (no I2C reads on config changes)
+        adps9960.resync()                       # Reload the cache if the device has been reset
     """
+    _regmap = APDS9960_MAP      # Chip register map, see APDS9900LITE
+
     def __init__(self,
-                i2c):      
+                i2c,
+                cache=False,
+                powerUp=True):      
         """Construct the APDS9960 driver class 
 
         :param i2c: The I2C driver
         :type i2C: machine.i2c
+
+        :param cache: Enables a write-through register cache shared by :attr:`prox`, :attr:`als` and :attr:`gesture`.
+                      Configuration changes is then a single I2C write (Default False)
+        :type cache: bool
+
+        :param powerUp: Power cycles the sensor (blocks for 50 ms). 
+                        Use :meth:`create` to power up without blocking (Default True)
+        :type powerUp: bool
         """
-        super().__init__(i2c,0x39) # initiate I2CEX with APDS9960_ADDR
+        cache=self.newCache() if cache else None
+        super().__init__(i2c,0x39,cache,self._regmap) # initiate I2CEX with APDS9960_ADDR
+        self.resync()       # Fill register cache (if enabled)
 
+        if powerUp:
+            self.powerOn(False) # APDS9960_ENABLE PON=0
+            sleep(.05)
+            self.powerOn(True) # APDS9960_ENABLE PON=1
+
+    @classmethod
+    async def create(cls,i2c,cache=False):
+        """Constructs and powers up the driver without blocking, other tasks 
+        (ex. other sensors powering up) run during the 50 ms power-up delay.
+
+        :param i2c: The I2C driver
+        :type i2C: machine.i2c
+
+        :param cache: Enables the register cache (Default False)
+        :type cache: bool
+
+        :returns: The powered up driver
+        :rtype: APDS9960LITE
+
+        :example:
+          .. code:: python
+
+            import uasyncio as asyncio
+
+            async def main():
+                left,right = await asyncio.gather(APDS9960LITE.create(i2c0),
+                                                  APDS9960LITE.create(i2c1))
+        """
+        try:
+            import uasyncio as asyncio
+        except ImportError:
+            import asyncio
+        self=cls(i2c,cache,powerUp=False)
         self.powerOn(False) # APDS9960_ENABLE PON=0
-        sleep(.05)
-        self.powerOn(True) # APDS9960_ENABLE PON=1
-        self.prox=PROX(i2c)
-        self.als=ALS(i2c)
+        await asyncio.sleep(.05)
+        self.powerOn(True)  # APDS9960_ENABLE PON=1
+        return self
         
-    prox = None
+    prox = LazyEngine('prox',PROX)
     """Prvides APDS9960 Proximity functions.See class: :class:`.PROX`  
+    (created on first access, the engines are views on this device core)
 
     :type PROX: 
 
@@ -413,11 +1148,25 @@ class APDS9960LITE(I2CEX) :
         apds9960.prox.enableProximity()    # Enable Proximit sensing
 
     """
-    als = None
+    als = LazyEngine('als',ALS)
     """Prvides APDS9960 Light sensor functions.See class: :class:`.ALS`  
+    (created on first access)
 
     :type PROX: 
     """
+    gesture = LazyEngine('gesture',_newGesture)
+    """Prvides APDS9960 Gesture functions.See class: :class:`uPy_APDS9960.gesture.GESTURE`  
+    (uPy_APDS9960/gesture.py is imported on first access)
+
+    :type GESTURE: 
+
+    :example:
+      .. code:: python
+
+        apds9960=APDS9960LITE(i2c)         # Enable sensor
+        apds9960.gesture.enableSensor()    # Enable gesture engine
+        print(apds9960.gesture.readGesture())
+    """
     def powerOn(self,on=True):
         """Enable/Disable the apds9960 sensor
 
@@ -427,7 +1176,185 @@ class APDS9960LITE(I2CEX) :
         """
 
         PON=0
-        super().__regWriteBit(reg=0x80,bitPos=PON,bitVal=on)
+        self._regWriteBit(reg=0x80,bitPos=PON,bitVal=on)
+
+    @property
+    def integrationTime(self):
+        """ALS / color integration time in ms (ATIME 0x81), 2.78 ms steps (APDS9900 2.72 ms).
+        Longer integration increases the resolution (1025 counts per 2.78 ms, max 65535) 
+        and lowers the sample rate.
+
+        :getter: Returns the integration time in ms (2.78 - 711.68)
+        :setter: Sets the integration time in ms, rounded to the nearest step
+        :type: float
+        """
+        return (256-self._readByte(0x81))*self._map.stepMs    # ATIME=256-cycles
+
+    @integrationTime.setter
+    def integrationTime(self, ms):
+        cycles=min(256,max(1,int(ms/self._map.stepMs+0.5)))
+        self._writeByte(0x81,(256-cycles) & 0xff)
+
+    @property
+    def waitTime(self):
+        """Wait time between the proximity / ALS cycles in ms (WTIME 0x83, WLONG CONFIG1<1>, WEN ENABLE<3>).
+        2.78 ms steps up to 711.68 ms, longer wait times use WLONG (33.36 ms steps up to 8540 ms).
+        The APDS9900 steps are 2.72 ms and 32.64 ms.
+        A longer wait lowers the sample rate and the power consumption.
+
+        :getter: Returns the wait time in ms, 0 when the wait state is disabled
+        :setter: Sets the wait time in ms, 0 disables the wait state
+        :type: float
+        """
+        if not self._readByte(0x80) & 0x08:        # WEN
+            return 0
+        ms=(256-self._readByte(0x83))*self._map.stepMs   # WTIME=256-cycles
+        if self._readByte(0x8D) & 0x02:            # WLONG, 12x wait
+            ms*=12
+        return ms
+
+    @waitTime.setter
+    def waitTime(self, ms):
+        WEN=3    #Wait enable bit 3 (WEN) in reg APDS9960_REG_ENABLE
+        WLONG=1  #Wait long bit 1 in reg APDS9960_REG_CONFIG1
+        step=self._map.stepMs
+        cycles=int(ms/step+0.5)
+        wlong=cycles>256
+        if wlong:
+            cycles=min(256,int(ms/(step*12)+0.5))
+        if cycles:
+            self._writeByte(0x83,(256-cycles) & 0xff)
+            self._regWriteBit(reg=0x8D,bitPos=WLONG,bitVal=wlong)
+        self._regWriteBit(reg=0x80,bitPos=WEN,bitVal=cycles>0)
+
+    @property
+    def sampleRate(self):
+        """Effective proximity / ALS sample rate given by the enabled engines, the integration time
+        and the wait time (APDS9960 proximity adds about 0.7 ms per cycle, APDS9900 the PTIME integration)
+
+        :getter: Returns the samples per second, 0 when the proximity and light engines are off
+        :type: float
+        """
+        en=self._readByte(0x80)
+        if not en & 0x01:                 # PON
+            return 0
+        ms=0
+        if en & 0x04:                     # PEN
+            ms+=self._map.proxMs or (256-self._readByte(0x82))*self._map.stepMs   # PTIME
+        if en & 0x02:                     # AEN
+            ms+=self.integrationTime
+        if not ms:
+            return 0
+        return 1000/(ms+self.waitTime)
+
+    def setTiming(self,preset):
+        """Sets the integration and wait time from a named preset (one configure() transaction)
+
+        :param preset: 'max rate', 'low power' or 'high sensitivity' (see TIMING_PRESETS, TIMING_PRESETS_9900)
+        :type preset: str
+
+        :returns: The effective sample rate (see :attr:`sampleRate`)
+        :rtype: float
+
+        :example:
+          .. code:: python
+
+            apds9960.prox.enableSensor()
+            apds9960.als.enableSensor()
+            print(apds9960.setTiming('low power'), "samples/s")
+        """
+        integration,wait=self._map.presets[preset]
+        with self.configure():
+            self.integrationTime=integration
+            self.waitTime=wait
+        return self.sampleRate
+
+    samples = None
+    """Interrupt samples (:class:`.SampleRing`) created by :meth:`attachInterrupt`"""
+
+    def attachInterrupt(self,pin,size=16,callback=None):
+        """Services the sensor interrupt (INT pin) without polling.
+        The pin IRQ records the time and schedules :meth:`serviceInterrupt` that reads the 
+        triggering channel, stores the sample in :attr:`samples` and clears the interrupt.
+        If INT is already low (no falling edge will follow) it is serviced here. 
+        Attach before enabling the interrupts and read the samples with :meth:`pollInterrupt`.
+
+        :param pin: The pin connected to the APDS9960 INT output
+        :type pin: machine.Pin
+
+        :param size: Number of samples buffered in :attr:`samples` (Default 16)
+        :type size: int
+
+        :param callback: Optional function called as callback(ticks, channel, value) for each sample
+        :type callback: function
+
+        :example:
+          .. code:: python
+
+            apds9960.prox.enableSensor()
+            apds9960.prox.setInterruptThreshold(high=10,low=0,persistance=7)
+            apds9960.attachInterrupt(machine.Pin(0, machine.Pin.IN ,machine.Pin.PULL_UP))
+            apds9960.prox.enableInterrupt()
+
+            while True:
+                sample=apds9960.pollInterrupt()  # (ticks_us, channel, value) or None 
+        """
+        from uPy_APDS9960.samplering import SampleRing   # Loaded on first use
+        self.samples=SampleRing(size)
+        self.__callback=callback
+        self.__irqTicks=ticks_us()
+        self.__service=self.serviceInterrupt  # Bound methods are allocated here, not in the IRQ 
+        self.__pin=pin
+        self.__pending=False
+        pin.irq(trigger=pin.IRQ_FALLING,handler=self.__irq)
+        if pin.value()==0:                    # Already asserted, no edge will follow
+            self.serviceInterrupt()
+
+    def detachInterrupt(self):
+        """Removes the pin IRQ handler installed by :meth:`attachInterrupt`"""
+        self.__pin.irq(handler=None)
+
+    def __irq(self,pin):
+        self.__irqTicks=ticks_us()
+        try:
+            schedule(self.__service,None)
+        except RuntimeError:                  # Schedule queue full, serviced by pollInterrupt() 
+            self.__pending=True
+
+    def pollInterrupt(self):
+        """Returns the oldest interrupt sample. An interrupt the pin IRQ could not service 
+        (schedule queue full, or INT low without a new falling edge) is serviced first.
+        No bus access while INT is high and nothing is pending.
+
+        :returns: (ticks_us, channel, value) or None
+        :rtype: tuple
+        """
+        if self.__pending:                    # IRQ time recorded by the pin IRQ
+            self.__pending=False
+            self.serviceInterrupt()
+        elif self.__pin.value()==0:
+            self.__irqTicks=ticks_us()
+            self.serviceInterrupt()
+        return self.samples.pop()
+
+    def serviceInterrupt(self,arg=None):
+        """Reads the channels that raised the interrupt and clears it.
+        Called through micropython.schedule() by the pin IRQ, may also be called directly
+        (ex. if the INT pin is still low) 
+        """
+        ticks=self.__irqTicks
+        status=self._readByte(0x93) & self._readByte(0x80)  # PINT/AINT masked by PIEN/AIEN
+        if status & 0x20:                     # PINT 
+            value=self._readProximity()   # PDATA
+            self.samples.push(ticks,CHANNEL_PROX,value)
+            if self.__callback:
+                self.__callback(ticks,CHANNEL_PROX,value)
+        if status & 0x10:                     # AINT
+            value=self._read2Byte(0x94)   # CDATAL and CDATAH
+            self.samples.push(ticks,CHANNEL_ALS,value)
+            if self.__callback:
+                self.__callback(ticks,CHANNEL_ALS,value)
+        self._special(0xE7)               # APDS9960_AICLEAR clear all non-gesture interrupts
 
 
     @property
@@ -451,7 +1378,9 @@ class APDS9960LITE(I2CEX) :
                 PVALID    1  Proximity Valid. 
                 AVALID    0  ALS Valid. 
                 ====== ===== =============================
+
+            On the APDS9900 (0x13) CPSAT, PGSAT and GINT are reserved.
  
             :rtype: int      
             """
-            return super().__readByte(0x93)
+            return self._readByte(0x93)
@@ -0,0 +1,270 @@
+"""`busmanager`
+====================================================
+
+Several APDS9960/APDS9900 sensors on one I2C bus.
+All the sensors use the fixed address 0x39, so each sensor is connected to its own channel
+of a TCA9548A I2C multiplexer. :meth:`TCA9548A.channel` returns an I2C driver for one channel
+that is given to the sensor constructor, and :class:`BusManager` schedules the sampling.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    from machine import Pin, I2C
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+    from uPy_APDS9960.busmanager import TCA9548A, BusManager
+
+    i2c =  I2C(0,scl=Pin(17), sda=Pin(16))
+    mux = TCA9548A(i2c)                       # Multiplexer at address 0x70
+    manager = BusManager()
+
+    for ch in range(4):                       # One sensor on mux channel 0 .. 3
+        bus=mux.channel(ch)
+        apds9960=APDS9960LITE(bus)
+        apds9960.prox.enableSensor()
+        manager.add(lambda s=apds9960: s.prox.proximityLevel, period_ms=50, bus=bus)
+
+    while True:
+        for id,value in manager.poll():
+            print(id,value)
+        manager.idle()
+"""
+from uPy_APDS9960.apds9960LITE import ticks_ms, ticks_diff, ticks_add, sleep_ms
+
+ROUND_ROBIN = 0
+DEADLINE = 1
+
+class TCA9548A:
+    """TCA9548A 8 channel I2C multiplexer.
+    The selected channel is cached, the control byte is only written when another channel is used.
+
+    :param i2c: The I2C driver the multiplexer is connected to
+    :type i2C: machine.i2c
+
+    :param address: The multiplexer address 0x70 - 0x77 (Default 0x70)
+    :type address: int
+
+    :example:
+      .. code:: python
+
+        mux = TCA9548A(i2c)
+        apds9960 = APDS9960LITE(mux.channel(3))   # Sensor connected to SD3/SC3
+    """
+    def __init__(self,i2c,address=0x70):
+        self.i2c=i2c
+        self.address=address
+        self.selected=None
+        """Selected channel, None when unknown / no channel selected"""
+        self.switches=0
+        """Number of control byte writes (channel changes)"""
+        self.__ctrl=[bytes((1<<n,)) for n in range(8)]
+        self.__channels=[None]*8
+
+    def select(self,channel):
+        """Selects a channel, does nothing when the channel is already selected
+
+        :param channel: The channel 0 - 7
+        :type channel: int
+        """
+        if channel!=self.selected:
+            self.selected=None      # Unknown until the write has succeeded
+            self.i2c.writeto(self.address,self.__ctrl[channel])
+            self.selected=channel
+            self.switches+=1
+
+    def disable(self):
+        """Disconnects all channels"""
+        self.selected=None
+        self.i2c.writeto(self.address,b'\x00')
+
+    def invalidate(self):
+        """Forgets the cached channel, the next access writes the control byte.
+        Call when the multiplexer might have been reset or used by other code"""
+        self.selected=None
+
+    def channel(self,channel):
+        """Returns the I2C driver of a channel
+
+        :param channel: The channel 0 - 7
+        :type channel: int
+
+        :returns: I2C driver that selects the channel before each transaction
+        :rtype: MuxChannel
+        """
+        bus=self.__channels[channel]
+        if bus is None:
+            bus=self.__channels[channel]=MuxChannel(self,channel)
+        return bus
+
+
+class MuxChannel:
+    """I2C driver of one :class:`TCA9548A` channel, implements the machine.I2C memory and
+    raw transfer methods. Created by :meth:`TCA9548A.channel`
+
+    :param mux: The multiplexer
+    :type mux: TCA9548A
+
+    :param channel: The channel 0 - 7
+    :type channel: int
+    """
+    def __init__(self,mux,channel):
+        self.mux=mux
+        self.channel=channel
+        self.__i2c=mux.i2c
+
+    def scan(self):
+        self.mux.select(self.channel)
+        return [a for a in self.__i2c.scan() if a!=self.mux.address]
+
+    def readfrom_mem_into(self,addr,reg,buf,*args):
+        self.mux.select(self.channel)
+        self.__i2c.readfrom_mem_into(addr,reg,buf,*args)
+
+    def readfrom_mem(self,addr,reg,n,*args):
+        self.mux.select(self.channel)
+        return self.__i2c.readfrom_mem(addr,reg,n,*args)
+
+    def writeto_mem(self,addr,reg,buf,*args):
+        self.mux.select(self.channel)
+        self.__i2c.writeto_mem(addr,reg,buf,*args)
+
+    def readfrom_into(self,addr,buf,*args):
+        self.mux.select(self.channel)
+        self.__i2c.readfrom_into(addr,buf,*args)
+
+    def readfrom(self,addr,n,*args):
+        self.mux.select(self.channel)
+        return self.__i2c.readfrom(addr,n,*args)
+
+    def writeto(self,addr,buf,*args):
+        self.mux.select(self.channel)
+        return self.__i2c.writeto(addr,buf,*args)
+
+
+class BusManager:
+    """Schedules the sampling of several sensors.
+    Each sensor read is added with a period, :meth:`poll` runs the reads that are due.
+    The due reads are ordered round-robin (each read gets its turn when the bus is busy)
+    or by deadline (most overdue first) and then grouped by multiplexer channel, so every
+    channel is selected once per poll.
+
+    :param mode: ROUND_ROBIN or DEADLINE (Default ROUND_ROBIN)
+    :type mode: int
+
+    :param limit: Maximum number of reads per :meth:`poll`, None for no limit (Default None)
+    :type limit: int
+    """
+    def __init__(self,mode=ROUND_ROBIN,limit=None):
+        self.mode=mode
+        self.limit=limit
+        self.__reads=[]         # [read, period, deadline, bus]
+        self.__next=0           # Round-robin start position
+        self.__results=[]
+
+    def add(self,read,period_ms=100,bus=None):
+        """Adds a sensor read
+
+        :param read: Function without arguments that reads the sensor and returns the value
+        :type read: function
+
+        :param period_ms: Sampling period in ms (Default 100)
+        :type period_ms: int
+
+        :param bus: The :class:`MuxChannel` the sensor is connected to,
+                    None when connected directly to the bus (Default None)
+        :type bus: MuxChannel
+
+        :returns: The id of the read, used in the :meth:`poll` results
+        :rtype: int
+        """
+        self.__reads.append([read,period_ms,ticks_ms(),bus])
+        return len(self.__reads)-1
+
+    def __due(self,now):
+        """Returns the ids of the due reads in scheduling order"""
+        reads=self.__reads
+        n=len(reads)
+        if self.mode==DEADLINE:
+            due=[i for i in range(n) if ticks_diff(now,reads[i][2])>=0]
+            due.sort(key=lambda i: ticks_diff(reads[i][2],now))
+        else:
+            start=self.__next
+            due=[(start+k)%n for k in range(n) if ticks_diff(now,reads[(start+k)%n][2])>=0]
+        if self.limit is not None:
+            due=due[:self.limit]
+        return due
+
+    def __group(self,due):
+        """Groups the ids by multiplexer channel, the channels keep the order of their first read"""
+        reads=self.__reads
+        order=[]
+        groups={}
+        for i in due:
+            bus=reads[i][3]
+            key=None if bus is None else (id(bus.mux),bus.channel)
+            g=groups.get(key)
+            if g is None:
+                g=groups[key]=[]
+                order.append(key)
+            g.append(i)
+        for key in order:            # Start with the channel that is already selected
+            bus=reads[groups[key][0]][3]
+            if bus is not None and bus.mux.selected==bus.channel:
+                order.remove(key)
+                order.insert(0,key)
+                break
+        return [i for key in order for i in groups[key]]
+
+    def poll(self,now=None):
+        """Runs the due reads
+
+        :param now: Time in ticks_ms (Default None = ticks_ms())
+        :type now: int
+
+        :returns: List of (id, value), the list is reused by the next call
+        :rtype: list
+        """
+        if now is None:
+            now=ticks_ms()
+        results=self.__results
+        results.clear()
+        reads=self.__reads
+        if not reads:
+            return results
+        due=self.__due(now)
+        for i in self.__group(due):
+            r=reads[i]
+            results.append((i,r[0]()))
+            deadline=ticks_add(r[2],r[1])
+            if ticks_diff(now,deadline)>=0:    # Behind by more than a period, skip the missed samples
+                deadline=ticks_add(now,r[1])
+            r[2]=deadline
+        if due and self.mode==ROUND_ROBIN:
+            self.__next=(due[-1]+1)%len(reads)
+        return results
+
+    def nextDeadline(self,now=None):
+        """Returns the time until the next read is due
+
+        :param now: Time in ticks_ms (Default None = ticks_ms())
+        :type now: int
+
+        :returns: ms until the next read, 0 when a read is due
+        :rtype: int
+        """
+        if now is None:
+            now=ticks_ms()
+        wait=None
+        for r in self.__reads:
+            d=ticks_diff(r[2],now)
+            if wait is None or d<wait:
+                wait=d
+        return 0 if wait is None or wait<0 else wait
+
+    def idle(self):
+        """Sleeps until the next read is due"""
+        ms=self.nextDeadline()
+        if ms:
+            sleep_ms(ms)
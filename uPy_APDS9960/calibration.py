@@ -0,0 +1,57 @@
+"""`calibration`
+====================================================
+
+APDS9960 proximity offset calibration, loaded by :meth:`.PROX.calibrate`, :meth:`.PROX.saveCalibration`
+and :meth:`.PROX.loadCalibration` on first use so applications that only read the proximity do not pay for it.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+from time import sleep
+
+def _sample(dev,timeout):
+    """Waits for a new proximity cycle (PVALID) and returns the proximity level"""
+    for i in range(timeout):
+        if dev._readByte(0x93) & 0x02:   # PVALID
+            return dev._readProximity()
+        sleep(.001)
+    raise OSError("No proximity data, is the sensor enabled?")
+
+def calibrate(prox,target=0,samples=4,timeout=500):
+    """Binary search of the proximity offset, see :meth:`.PROX.calibrate`
+
+    :param prox: The proximity engine
+    :type prox: PROX
+    """
+    dev=prox._dev
+    low=0
+    high=127
+    while low<high:
+        offset=(low+high)>>1
+        prox.offsetUR=offset
+        prox.offsetDL=offset
+        _sample(dev,timeout)                 # Cycle started with the old offset
+        level=0
+        for i in range(samples):
+            level+=_sample(dev,timeout)
+        if level<=target*samples:
+            high=offset
+        else:
+            low=offset+1
+    prox.offsetUR=low
+    prox.offsetDL=low
+    return low
+
+def saveCalibration(dev,filename):
+    """Stores POFFSET_UR and POFFSET_DL in a 2 byte file, see :meth:`.PROX.saveCalibration`"""
+    with open(filename,'wb') as f:
+        f.write(bytes((dev._readByte(0x9d),dev._readByte(0x9e))))
+
+def loadCalibration(dev,filename):
+    """Writes POFFSET_UR and POFFSET_DL stored by :func:`saveCalibration`, see :meth:`.PROX.loadCalibration`"""
+    with open(filename,'rb') as f:
+        b=f.read(2)
+    if len(b)!=2:
+        raise OSError("Invalid calibration file")
+    dev._writeByte(0x9d,b[0])
+    dev._writeByte(0x9e,b[1])
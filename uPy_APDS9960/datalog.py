@@ -0,0 +1,153 @@
+"""`datalog`
+====================================================
+
+Binary logging of proximity and light samples to flash.
+Each sample is a fixed size record of little endian uint16 words collected in a preallocated
+page sized buffer, the buffer is written to the file when full (one flash write per page).
+The file is decoded on the host by ``tools/logreader.py``.
+
+File format::
+
+    Header (16 bytes)
+      0  4s  magic b'APDL'
+      4  B   version (1)
+      5  B   channels (bit 0 proximity, bit 1 clear / red / green / blue)
+      6  H   record size in bytes
+      8  I   ticks_ms when the log was opened
+      12 4x  reserved
+    Records
+      H      ms since the previous record / the header (0xFFFF: 65535 ms or more, a gap)
+      H      proximity                          (channels bit 0)
+      4H     clear, red, green, blue            (channels bit 1)
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+    from uPy_APDS9960.datalog import DataLog
+
+    apds9960=APDS9960LITE(i2c)
+    apds9960.prox.enableSensor()
+    apds9960.als.enableSensor()
+
+    with DataLog('trace.bin', prox=True, rgbc=True) as log:
+        for i in range(10000):
+            log.record(apds9960)      # Reads the sensor and appends a record
+            sleep_ms(50)
+"""
+from array import array
+from uPy_APDS9960.apds9960LITE import ticks_ms, ticks_diff
+
+MAGIC = b'APDL'
+VERSION = 1
+HEADER_SIZE = 16
+LOG_PROX = 0x01     # channels bit 0
+LOG_RGBC = 0x02     # channels bit 1
+GAP = 0xFFFF        # Delta of records 65535 ms or more after the previous
+
+class DataLog:
+    """Writes samples as fixed size binary records through a page sized buffer.
+
+    :param filename: The log file (overwritten)
+    :type filename: str
+
+    :param prox: Log the proximity level (Default True)
+    :type prox: bool
+
+    :param rgbc: Log the clear, red, green and blue channels (Default False)
+    :type rgbc: bool
+
+    :param page: Buffer size in bytes, use the flash block size (Default 4096)
+    :type page: int
+    """
+    def __init__(self,filename,prox=True,rgbc=False,page=4096):
+        self.channels=(LOG_PROX if prox else 0)|(LOG_RGBC if rgbc else 0)
+        self.recordSize=2+(2 if prox else 0)+(8 if rgbc else 0)
+        self.records=0
+        """Number of records logged"""
+        self.__buf=bytearray((page//self.recordSize)*self.recordSize)
+        self.__mv=memoryview(self.__buf)
+        self.__pos=0
+        self.__last=ticks_ms()
+        self.__rgbc=array('H',(0,0,0,0))
+        h=bytearray(HEADER_SIZE)
+        h[0:4]=MAGIC
+        h[4]=VERSION
+        h[5]=self.channels
+        h[6]=self.recordSize
+        for i in range(4):
+            h[8+i]=(self.__last>>(8*i)) & 0xff
+        self.__file=open(filename,'wb')
+        self.__file.write(h)
+
+    def add(self,prox=0,rgbc=None,ticks=None):
+        """Appends a record (no heap allocation unless the buffer is written to the file)
+
+        :param prox: The proximity level (Default 0)
+        :type prox: int
+
+        :param rgbc: The clear, red, green and blue levels, ex. from :meth:`.ALS.readRGBC` (Default None, zeros)
+        :type rgbc: array
+
+        :param ticks: The sample time in ticks_ms (Default None = ticks_ms())
+        :type ticks: int
+        """
+        if ticks is None:
+            ticks=ticks_ms()
+        delta=ticks_diff(ticks,self.__last)
+        if delta>GAP or delta<0:
+            delta=GAP
+        self.__last=ticks
+        b=self.__buf
+        i=self.__pos
+        b[i]=delta & 0xff
+        b[i+1]=delta >> 8
+        i+=2
+        if self.channels & LOG_PROX:
+            b[i]=prox & 0xff
+            b[i+1]=(prox >> 8) & 0xff
+            i+=2
+        if self.channels & LOG_RGBC:
+            for k in range(4):
+                v=rgbc[k] if rgbc is not None else 0
+                b[i]=v & 0xff
+                b[i+1]=(v >> 8) & 0xff
+                i+=2
+        self.__pos=i
+        self.records+=1
+        if i==len(b):
+            self.flush()
+
+    def record(self,dev):
+        """Reads the logged channels from the sensor and appends a record
+
+        :param dev: The sensor driver
+        :type dev: APDS9960LITE
+        """
+        prox=dev.prox.proximityLevel if self.channels & LOG_PROX else 0
+        rgbc=dev.als.readRGBC(self.__rgbc) if self.channels & LOG_RGBC else None
+        self.add(prox,rgbc)
+
+    def flush(self):
+        """Writes the buffered records to the file"""
+        if self.__pos:
+            self.__file.write(self.__mv[:self.__pos])
+            self.__file.flush()
+            self.__pos=0
+
+    def close(self):
+        """Writes the buffered records and closes the file"""
+        if self.__file is not None:
+            self.flush()
+            self.__file.close()
+            self.__file=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
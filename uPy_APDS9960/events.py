@@ -0,0 +1,131 @@
+"""`events`
+====================================================
+
+Proximity events (enter, leave, hover) detected by the APDS9960 interrupt engine.
+The proximity thresholds (PILT / PIHT) are re-armed after each edge so the INT pin
+only wakes the host on a state change, nothing is read from the bus while the state is unchanged.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    import machine
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+    from uPy_APDS9960.events import ProximityEvents, EVENT_ENTER, EVENT_LEAVE, EVENT_HOVER
+
+    apds9960=APDS9960LITE(i2c)
+    apds9960.prox.enableSensor()
+    events=ProximityEvents(apds9960, machine.Pin(0, machine.Pin.IN, machine.Pin.PULL_UP),
+                           enter=50, leave=30, hover_ms=1000)
+    while True:
+        event=events.pop()          # (ticks_us, event, proximity) or None
+        if event:
+            print(event)
+        machine.idle()
+"""
+from uPy_APDS9960.apds9960LITE import CHANNEL_PROX, ticks_us, ticks_diff
+from uPy_APDS9960.samplering import SampleRing
+
+EVENT_ENTER = 1     # Proximity rose above the enter level
+EVENT_LEAVE = 2     # Proximity fell below the leave level
+EVENT_HOVER = 3     # The object stayed for hover_ms after EVENT_ENTER
+
+class ProximityEvents:
+    """Hardware driven enter / leave / hover state machine.
+
+    While no object is near the interrupt is armed above the enter level (PILT=0, PIHT=enter),
+    after EVENT_ENTER it is armed below the leave level (PILT=leave, PIHT=full scale).
+    The proximity engine must be enabled.
+
+    :param dev: The sensor driver
+    :type dev: APDS9960LITE
+
+    :param pin: The pin connected to the APDS9960 INT output
+    :type pin: machine.Pin
+
+    :param enter: Proximity level for EVENT_ENTER (Default 50)
+    :type enter: int
+
+    :param leave: Proximity level for EVENT_LEAVE, below enter for hysteresis (Default 30)
+    :type leave: int
+
+    :param hover_ms: Time near before EVENT_HOVER, 0 disables hover events (Default 1000)
+    :type hover_ms: int
+
+    :param persistance: Consecutive proximity cycles beyond the level before an edge is reported (Range 0 - 7, Default 2)
+    :type persistance: int
+
+    :param size: Number of queued events (Default 8)
+    :type size: int
+
+    :param callback: Optional function called as callback(ticks, event, proximity) from the scheduled interrupt service
+    :type callback: function
+    """
+    def __init__(self,dev,pin,enter=50,leave=30,hover_ms=1000,persistance=2,size=8,callback=None):
+        self.__dev=dev
+        self.__enter=enter
+        self.__leave=leave
+        self.__hoverUs=hover_ms*1000
+        self.__persistance=persistance
+        self.__callback=callback
+        self.events=SampleRing(size)
+        """Queued events (:class:`.SampleRing` of (ticks_us, event, proximity))"""
+        self.near=False
+        """True while an object is near (after EVENT_ENTER until EVENT_LEAVE)"""
+        self.__since=0
+        self.__value=0
+        self.__hovered=True
+        self.__arm()
+        dev.attachInterrupt(pin,size=1,callback=self.__sample)
+        dev.prox.enableInterrupt()
+
+    def __arm(self):
+        """Programs the thresholds for the next edge"""
+        if self.near:
+            self.__dev.prox.setInterruptThreshold(high=self.__dev._map.proxMax,low=self.__leave,persistance=self.__persistance)
+        else:
+            self.__dev.prox.setInterruptThreshold(high=self.__enter,low=0,persistance=self.__persistance)
+
+    def __emit(self,ticks,event,value):
+        self.events.push(ticks,event,value)
+        if self.__callback:
+            self.__callback(ticks,event,value)
+
+    def __sample(self,ticks,channel,value):
+        """Interrupt sample from APDS9960LITE.serviceInterrupt()"""
+        if channel!=CHANNEL_PROX:
+            return
+        if not self.near and value>self.__enter:
+            self.near=True
+            self.__since=ticks
+            self.__value=value
+            self.__hovered=not self.__hoverUs
+            self.__arm()
+            self.__emit(ticks,EVENT_ENTER,value)
+        elif self.near and value<self.__leave:
+            self.__checkHover(ticks)
+            self.near=False
+            self.__arm()
+            self.__emit(ticks,EVENT_LEAVE,value)
+
+    def __checkHover(self,now):
+        if self.near and not self.__hovered and ticks_diff(now,self.__since)>=self.__hoverUs:
+            self.__hovered=True
+            self.__emit((self.__since+self.__hoverUs) & 0x3fffffff,EVENT_HOVER,self.__value)
+
+    def pop(self):
+        """Returns the oldest event, EVENT_HOVER is added when hover_ms has passed since EVENT_ENTER
+        (checked here, no bus access)
+
+        :returns: (ticks_us, event, proximity) or None, the proximity of EVENT_HOVER is the EVENT_ENTER level
+        :rtype: tuple
+        """
+        self.__checkHover(ticks_us())
+        return self.events.pop()
+
+    def close(self):
+        """Disables the proximity interrupt and removes the pin IRQ handler"""
+        self.__dev.detachInterrupt()
+        self.__dev.prox.enableInterrupt(False)
@@ -0,0 +1,148 @@
+"""`filters`
+====================================================
+
+Composable filters for proximity and light samples.
+Each filter is a generator that takes a source iterator and yields one output per input sample,
+the state is kept in fixed size arrays and only integer arithmetic is used,
+so memory per filter is constant and the cost per sample is bounded.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+    from uPy_APDS9960.filters import poll, median, ema, debounce
+
+    apds9960=APDS9960LITE(i2c)
+    apds9960.prox.enableSensor()
+
+    level=ema(median(poll(lambda: apds9960.prox.proximityLevel, 25), 5), 2)
+    for near in debounce(level, threshold=40, count=3, hysteresis=10):
+        print("near" if near else "far")
+"""
+from array import array
+from uPy_APDS9960.apds9960LITE import sleep_ms
+
+def poll(read,period_ms=0):
+    """Source that calls read() for each sample
+
+    :param read: Function without arguments returning the sample, ex. lambda: apds9960.prox.proximityLevel
+    :type read: function
+
+    :param period_ms: Sleep before each read in ms (Default 0, no sleep)
+    :type period_ms: int
+    """
+    while True:
+        if period_ms:
+            sleep_ms(period_ms)
+        yield read()
+
+def field(source,index=2):
+    """Selects one element of the samples, ex. the value of the (ticks, channel, value) samples
+    from :meth:`.SampleRing.pop`. None samples (empty ring) are skipped.
+
+    :param source: Iterator of tuples
+    :param index: The element (Default 2, the value)
+    :type index: int
+    """
+    for sample in source:
+        if sample is not None:
+            yield sample[index]
+
+def median(source,size=5):
+    """Running median of the last size samples, removes spikes.
+    A ring of the samples and a sorted copy are updated by insertion (size steps per sample)
+
+    :param source: Iterator of int
+    :param size: Number of samples, odd (Default 5)
+    :type size: int
+    """
+    ring=array('l',[0]*size)
+    ordered=array('l',[0]*size)
+    n=0
+    pos=0
+    for x in source:
+        if n<size:
+            n+=1
+        else:
+            old=ring[pos]                  # Remove the oldest sample from the sorted copy
+            i=0
+            while ordered[i]!=old:
+                i+=1
+            while i<n-1:
+                ordered[i]=ordered[i+1]
+                i+=1
+        ring[pos]=x
+        pos+=1
+        if pos==size:
+            pos=0
+        i=n-1                              # Insert the new sample
+        while i>0 and ordered[i-1]>x:
+            ordered[i]=ordered[i-1]
+            i-=1
+        ordered[i]=x
+        yield ordered[(n-1)>>1]
+
+def ema(source,shift=2):
+    """Exponential moving average y += (x - y) / 2**shift with integer arithmetic.
+    The average is kept with shift extra fraction bits so small changes are not lost.
+
+    :param source: Iterator of int
+    :param shift: Smoothing, 1 (fast) - 8 (slow) (Default 2, alpha 1/4)
+    :type shift: int
+    """
+    acc=None
+    for x in source:
+        if acc is None:
+            acc=x<<shift
+        else:
+            acc+=x-(acc>>shift)
+        yield acc>>shift
+
+def debounce(source,threshold,count=3,hysteresis=0):
+    """Converts samples to a stable on/off state. The state turns on after count consecutive
+    samples above threshold and off after count consecutive samples below threshold - hysteresis
+
+    :param source: Iterator of int
+    :param threshold: On level
+    :type threshold: int
+    :param count: Consecutive samples needed to change the state (Default 3)
+    :type count: int
+    :param hysteresis: Off level is threshold - hysteresis (Default 0)
+    :type hysteresis: int
+    """
+    state=False
+    n=0
+    for x in source:
+        if (not state and x>threshold) or (state and x<threshold-hysteresis):
+            n+=1
+            if n>=count:
+                state=not state
+                n=0
+        else:
+            n=0
+        yield state
+
+def rateOfChange(source,interval=1):
+    """Difference to the sample interval samples earlier (0 until interval samples are seen)
+
+    :param source: Iterator of int
+    :param interval: Distance in samples (Default 1)
+    :type interval: int
+    """
+    ring=array('l',[0]*interval)
+    pos=0
+    n=0
+    for x in source:
+        old=ring[pos]
+        ring[pos]=x
+        pos+=1
+        if pos==interval:
+            pos=0
+        if n<interval:
+            n+=1
+            yield 0
+        else:
+            yield x-old
@@ -0,0 +1,293 @@
+"""`gesture`
+====================================================
+
+APDS9960 gesture engine, loaded by :attr:`.APDS9960LITE.gesture` on first use so 
+proximity / light applications do not pay for it.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE
+    from uPy_APDS9960.gesture import GESTURE_UP
+
+    apds9960=APDS9960LITE(i2c)
+    apds9960.gesture.enableSensor()       # Imports this module
+    if apds9960.gesture.readGesture()==GESTURE_UP:
+        print("up")
+"""
+from uPy_APDS9960.apds9960LITE import RegField
+try:
+    from micropython import const
+except ImportError:                     # CPython (host side simulation)
+    def const(x):
+        return x
+
+# Gestures returned by GESTURE.readGesture()
+GESTURE_NONE  = const(0)
+GESTURE_UP    = const(1)
+GESTURE_DOWN  = const(2)
+GESTURE_LEFT  = const(3)
+GESTURE_RIGHT = const(4)
+GESTURE_NEAR  = const(5)
+GESTURE_FAR   = const(6)
+
+GESTURE_THRESHOLD_OUT = const(10)   # U/D/L/R level that counts as an object in view
+GESTURE_SENSITIVITY   = const(50)   # Change of U/D or L/R ratio (%) needed for a swipe
+GESTURE_NEAR_LEVEL    = const(800)  # U+D+L+R sum needed for near / far
+
+class GESTURE:
+    """APDS9960 gesture engine.
+    Drains the U/D/L/R FIFO (0xFC - 0xFF) with one burst read and classifies the swipe direction.
+
+    :param dev: The device core (bus, address, buffers and register cache) shared by all engines
+    :type dev: I2CEX
+    """    
+    def __init__(self,
+                 dev):
+        self._dev=dev
+        self.__fifo=bytearray(128)       # 32 datasets x (U,D,L,R)
+        self.__fifoView=memoryview(self.__fifo)
+        self.__status=memoryview(dev._scratch)[0:4]  # GCONF4 - GFLVL, no allocation per read
+        self.__reset()
+
+    def enableSensor(self,on=True):
+        """Enable/Disable the gesture engine 
+        (the proximity engine is enabled as well as it triggers gesture mode)
+
+        :param on: Enables / Disables the gesture sensor
+                (Default True)
+        :type on: bool
+        """
+        PEN=2  #Proximity enable bit 2 (PEN) in reg APDS9960_REG_ENABLE
+        GEN=6  #Gesture enable bit 6 (GEN) in reg APDS9960_REG_ENABLE
+        if on:
+            self._dev._regUpdate(0x80,(1<<PEN)|(1<<GEN),0xff)  # One ENABLE write 
+        else:
+            self._dev._regWriteBit(reg=0x80,bitPos=GEN,bitVal=False)
+
+    def setThreshold(self,enter=40,exit=30,persistance=0,eFifoThreshold=2):
+        """Sets the proximity levels for entering and exiting gesture mode
+
+        :param enter: Gesture mode is entered when the proximity level is above enter (Range 0 - 255)
+        :type enter: int 
+
+        :param exit: Gesture mode is exited when all U/D/L/R levels are below exit (Range 0 - 255)
+        :type exit: int 
+
+        :param persistance: Number of consecutive exit levels before gesture mode is exited (Range 0 - 3)
+                            ::
+
+                                persistance  datasets
+                                  0            1
+                                  1            2
+                                  2            4
+                                  3            7
+        :type persistance: int 
+
+        :param eFifoThreshold: FIFO level that raises the gesture interrupt (Range 0 - 3)
+                               ::
+
+                                   eFifoThreshold  datasets
+                                     0               1
+                                     1               4
+                                     2               8
+                                     3              16
+        :type eFifoThreshold: int 
+        """
+        self._dev._writeByte(0xA0,enter)   # GPENTH
+        self._dev._writeByte(0xA1,exit)    # GEXTH
+        # GCONF1 <7:6> GFIFOTH <5:2> GEXMSK (all channels) <1:0> GEXPERS
+        self._dev._writeByte(0xA2,((eFifoThreshold & 0b11)<<6) | (persistance & 0b11))
+
+    eGestureGain = RegField(0xa3,5,2)
+    """Receiver gain for gesture detection (GCONF2 GGAIN<6:5>) (0 - 3)
+
+    ::
+
+        eGain    Gain
+          0       1x
+          1       2x
+          2       4x
+          3       8x
+    """
+
+    eGestureLEDCurrent = RegField(0xa3,3,2)
+    """LED current for gesture detection (GCONF2 GLDRIVE<4:3>) (0 - 3)
+
+    ::
+
+      eCurent  LED Current
+        0        100 mA
+        1         50 mA
+        2         25 mA
+        3         12.5 mA
+    """
+
+    waitTime = RegField(0xa3,0,3)
+    """Wait between gesture cycles (GCONF2 GWTIME<2:0>) 0: 0 ms, 1: 2.8 ms, 2: 5.6 ms, 3: 8.4 ms, 
+    4: 14 ms, 5: 22.4 ms, 6: 30.8 ms, 7: 39.2 ms"""
+
+    enterThreshold = RegField(0xa0)
+    """Proximity level that enters gesture mode (GPENTH) (0 - 255)"""
+
+    exitThreshold = RegField(0xa1)
+    """U/D/L/R level below which gesture mode is exited (GEXTH) (0 - 255)"""
+
+    fifoThreshold = RegField(0xa2,6,2)
+    """FIFO level that raises the gesture interrupt (GCONF1 GFIFOTH<7:6>) 0: 1, 1: 4, 2: 8, 3: 16 datasets"""
+
+    exitMask = RegField(0xa2,2,4)
+    """Photodiodes ignored by the exit threshold (GCONF1 GEXMSK<5:2>), bit 3 up - bit 0 right"""
+
+    exitPersistance = RegField(0xa2,0,2)
+    """Exit levels needed to exit gesture mode (GCONF1 GEXPERS<1:0>) 0: 1, 1: 2, 2: 4, 3: 7 datasets"""
+
+    pulseLength = RegField(0xa6,6,2)
+    """Gesture LED pulse length (GPULSE GPLEN<7:6>) 0: 4 us, 1: 8 us, 2: 16 us, 3: 32 us"""
+
+    dimensions = RegField(0xaa,0,2)
+    """Photodiode pairs used (GCONF3 GDIMS<1:0>) 0: both, 1: up / down, 2: left / right, 3: both"""
+
+    mode = RegField(0xab,0,1)
+    """Gesture mode, set while the gesture state machine runs (GCONF4 GMODE<0>)"""
+
+    def enableInterrupt(self,on=True):
+        """Enables/Disables the gesture IRQ raised when the FIFO level reaches the fifo threshold
+        (see :meth:`setThreshold`). The IRQ is cleared by :meth:`readGesture` emptying the FIFO.
+
+        :param on: Enable / Disable Hardware IRQ  
+        :type on: bool 
+        """
+        GIEN=1    #Gesture interrupt enable bit 1 (GIEN) in reg APDS9960_GCONF4
+        self._dev._regWriteBit(reg=0xAB,bitPos=GIEN,bitVal=on)
+
+    def clearFifo(self):
+        """Clears the gesture FIFO, GINT, GVALID, GFIFO_OV and GFIFO_LVL"""
+        GFIFO_CLR=2  #FIFO clear bit 2 (GFIFO_CLR) in reg APDS9960_GCONF4
+        self._dev._regWriteBit(reg=0xAB,bitPos=GFIFO_CLR,bitVal=True)
+        self.__reset()
+
+    @property
+    def fifoLevel(self):
+        """Number of datasets in the gesture FIFO (GFLVL 0xAE)
+
+            :getter: Returns the number of U/D/L/R datasets (0 - 32 ) 
+            :type: int     
+        """
+        return self._dev._readByte(0xAE)
+
+    def readFifo(self):
+        """Drains the gesture FIFO with one burst read 
+
+        :returns: Number of datasets read. Dataset n is (U,D,L,R) = :attr:`fifo` [4*n : 4*n+4]
+        :rtype: int
+        """
+        return self.__drain(self._dev._readByte(0xAE))     # GFLVL
+
+    def __drain(self,n):
+        if n:
+            self._dev._readInto(0xFC,self.__fifoView[0:n*4])  # GFIFO_U .. GFIFO_R auto-increment
+        return n
+
+    @property
+    def fifo(self):
+        """The dataset buffer filled by :meth:`readFifo` 
+
+            :getter: Returns the U/D/L/R dataset buffer (128 bytes) 
+            :type: bytearray     
+        """
+        return self.__fifo
+
+    @property
+    def active(self):
+        """True while the datasets of an unfinished gesture are collected (no bus access).
+        The last datasets of a gesture may stay below the FIFO interrupt threshold, 
+        keep calling :meth:`readGesture` while active to get the gesture.
+
+            :getter: Returns True until the gesture is classified
+            :type: bool
+        """
+        return self.__count>0
+
+    def readGesture(self):
+        """Drains the FIFO and feeds the datasets to the gesture classifier.
+        The gesture is classified when a dataset below the out threshold arrives or 
+        when the engine has left gesture mode (GMODE cleared).
+
+        :returns: The detected gesture or GESTURE_NONE while no gesture is completed
+        :rtype: int
+
+            ::
+
+                Gesture         Value
+                GESTURE_NONE      0
+                GESTURE_UP        1
+                GESTURE_DOWN      2
+                GESTURE_LEFT      3
+                GESTURE_RIGHT     4
+                GESTURE_NEAR      5
+                GESTURE_FAR       6
+        """
+        GMODE=1  #Gesture mode bit 0 (GMODE) in reg APDS9960_GCONF4 is cleared on exit
+        b=self.__status
+        self._dev._readInto(0xAB,b)     # GCONF4 - GFLVL in one burst, GMODE is read before the FIFO
+        done=not (b[0] & GMODE)         # No datasets are added after the exit
+        n=self.__drain(b[3])
+        f=self.__fifo
+        gesture=GESTURE_NONE
+        for i in range(0,n*4,4):
+            g=self.__feed(f[i],f[i+1],f[i+2],f[i+3])
+            if g:
+                gesture=g
+        if done and self.__count:
+            gesture=self.__classify()
+        return gesture
+
+    def __reset(self):
+        self.__count=0     # Number of datasets in the current gesture
+        self.__udFirst=0
+        self.__lrFirst=0
+        self.__udLast=0
+        self.__lrLast=0
+        self.__peak=0      # Highest U+D+L+R sum and its dataset number
+        self.__peakAt=0
+
+    def __feed(self,u,d,l,r):
+        """Adds one dataset to the gesture, returns the gesture when the object has left"""
+        if u>GESTURE_THRESHOLD_OUT and d>GESTURE_THRESHOLD_OUT and l>GESTURE_THRESHOLD_OUT and r>GESTURE_THRESHOLD_OUT:
+            ud=((u-d)*100)//(u+d)
+            lr=((l-r)*100)//(l+r)
+            if self.__count==0:
+                self.__udFirst=ud
+                self.__lrFirst=lr
+            self.__udLast=ud
+            self.__lrLast=lr
+            self.__count+=1
+            s=u+d+l+r
+            if s>self.__peak:
+                self.__peak=s
+                self.__peakAt=self.__count
+            return GESTURE_NONE
+        if self.__count:
+            return self.__classify()
+        return GESTURE_NONE
+
+    def __classify(self):
+        """Classifies the collected datasets from the change of the U/D and L/R ratios"""
+        dud=self.__udLast-self.__udFirst
+        dlr=self.__lrLast-self.__lrFirst
+        gesture=GESTURE_NONE
+        if abs(dud)>=GESTURE_SENSITIVITY or abs(dlr)>=GESTURE_SENSITIVITY:
+            # The object moves from the U (L) diode towards the D (R) diode when the ratio falls
+            if abs(dud)>abs(dlr):
+                gesture=GESTURE_DOWN if dud<0 else GESTURE_UP
+            else:
+                gesture=GESTURE_RIGHT if dlr<0 else GESTURE_LEFT
+        elif self.__peak>=GESTURE_NEAR_LEVEL:
+            # Approaching objects peak at the end, receding objects at the start
+            gesture=GESTURE_NEAR if self.__peakAt*2>self.__count else GESTURE_FAR
+        self.__reset()
+        return gesture
@@ -0,0 +1,97 @@
+"""`i2cstats`
+====================================================
+
+Bus instrumentation of the device core, loaded by :meth:`.I2CEX.enableStats` on first use
+so applications that do not measure the bus do not pay for it.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+from uPy_APDS9960.apds9960LITE import ticks_us, ticks_diff
+
+class I2CStats:
+    """Instrumented I2C bus used by :meth:`.I2CEX.enableStats`.
+    Counts reads and writes per register, the time spent on the bus (ticks_us), the maximum 
+    latency per operation and NACK/OSError retries.
+
+    :param i2c: The I2C driver that is measured
+    :type i2C: machine.i2c
+
+    :param retries: Number of times a failing (OSError) transaction is retried (Default 0)
+    :type retries: int
+    """
+    def __init__(self,i2c,retries=0):
+        self.i2c=i2c
+        self.retries=retries
+        self.reset()
+
+    def reset(self):
+        """Clears the counters"""
+        self.registers={}      # reg : [reads, writes]
+        self.reads=0
+        self.writes=0
+        self.bytes=0
+        self.busUs=0
+        self.maxReadUs=0
+        self.maxWriteUs=0
+        self.errors=0
+        self.retried=0
+
+    def __count(self,reg,op):
+        c=self.registers.get(reg)
+        if c is None:
+            c=self.registers[reg]=[0,0]
+        c[op]+=1
+
+    def readfrom_mem_into(self,addr,reg,buf):
+        attempt=0
+        while True:
+            t=ticks_us()
+            try:
+                self.i2c.readfrom_mem_into(addr,reg,buf)
+                break
+            except OSError:
+                self.errors+=1
+                if attempt>=self.retries:
+                    raise
+                attempt+=1
+                self.retried+=1
+        us=ticks_diff(ticks_us(),t)
+        self.busUs+=us
+        if us>self.maxReadUs:
+            self.maxReadUs=us
+        self.reads+=1
+        self.bytes+=len(buf)
+        self.__count(reg,0)
+
+    def readfrom_mem(self,addr,reg,n):
+        buf=bytearray(n)
+        self.readfrom_mem_into(addr,reg,buf)
+        return bytes(buf)
+
+    def writeto(self,addr,buf):
+        self.writeto_mem(addr,None,buf)      # Command byte only (APDS9900 special function)
+
+    def writeto_mem(self,addr,reg,buf):
+        attempt=0
+        while True:
+            t=ticks_us()
+            try:
+                if reg is None:
+                    self.i2c.writeto(addr,buf)
+                else:
+                    self.i2c.writeto_mem(addr,reg,buf)
+                break
+            except OSError:
+                self.errors+=1
+                if attempt>=self.retries:
+                    raise
+                attempt+=1
+                self.retried+=1
+        us=ticks_diff(ticks_us(),t)
+        self.busUs+=us
+        if us>self.maxWriteUs:
+            self.maxWriteUs=us
+        self.writes+=1
+        self.bytes+=len(buf)
+        self.__count(buf[0] if reg is None else reg,1)
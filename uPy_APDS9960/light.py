@@ -0,0 +1,166 @@
+"""`light`
+====================================================
+
+APDS9960 illuminance, colour temperature and auto-range, loaded by :class:`.ALS` on first use
+(:attr:`.ALS.lux`, :attr:`.ALS.colorTemperature`, :meth:`.ALS.convert`, :meth:`.ALS.enableAutoRange`
+and :meth:`.ALS.readNormalized`) so applications that only read the light levels do not pay for it.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+try:
+    from micropython import const
+except ImportError:                     # CPython (host side simulation)
+    def const(x):
+        return x
+
+# Lux and colour temperature (DN40 open air coefficients, scaled by 1024 for integer math)
+LUX_DF     = const(310)     # Device factor
+LUX_R      = const(139)     # 0.136 * 1024
+LUX_G      = const(1024)    # 1.0   * 1024
+LUX_B      = const(-455)    # -0.444 * 1024
+CCT_COEF   = const(3810)
+CCT_OFFSET = const(1391)
+_LUX_SCALE = {}             # (AGAIN<<9)|cycles : (k, shift), see _luxScale()
+
+def _luxScale(again,cycles):
+    """Returns the fixed point lux scale (k, shift) = DF/(integration ms * gain) as k/2**shift
+    with k in 4096 - 8191. Computed once per gain and integration time"""
+    key=(again<<9)|cycles
+    scale=_LUX_SCALE.get(key)
+    if scale is None:
+        div=cycles*278*(1,4,16,64)[again]   # 100 * integration ms * gain
+        shift=0
+        while (LUX_DF*100<<shift)//div<4096:
+            shift+=1
+        scale=_LUX_SCALE[key]=((LUX_DF*100<<shift)//div,shift)
+    return scale
+
+def _lux(c,r,g,b,k,shift):
+    """Lux of one RGBC sample (integer math only)"""
+    ir=(r+g+b-c)>>1                    # IR component
+    s=LUX_R*(r-ir)+LUX_G*(g-ir)+LUX_B*(b-ir)
+    if s<=0:
+        return 0
+    return ((s>>10)*k)>>shift
+
+def _cct(c,r,g,b):
+    """Correlated colour temperature (K) of one RGBC sample (integer math only)"""
+    ir=(r+g+b-c)>>1
+    r-=ir
+    if r<=0:
+        return 0
+    return CCT_COEF*(b-ir)//r+CCT_OFFSET
+
+def _scale(dev):
+    """Returns the lux scale (k, shift) of the current gain and integration time"""
+    return _luxScale(dev._readByte(0x8f) & 0x03,(256-dev._readByte(0x81)) or 256)
+
+def lux(dev):
+    """Illuminance of one RGBC readout, see :attr:`.ALS.lux`"""
+    k,shift=_scale(dev)
+    b=dev._scratch
+    dev._readInto(0x94,b)       #CDATAL, CDATAH, RDATAL .. BDATAH
+    return _lux(b[0]|(b[1]<<8), b[2]|(b[3]<<8), b[4]|(b[5]<<8), b[6]|(b[7]<<8), k, shift)
+
+def colorTemperature(dev):
+    """Colour temperature of one RGBC readout, see :attr:`.ALS.colorTemperature`"""
+    b=dev._scratch
+    dev._readInto(0x94,b)       #CDATAL, CDATAH, RDATAL .. BDATAH
+    return _cct(b[0]|(b[1]<<8), b[2]|(b[3]<<8), b[4]|(b[5]<<8), b[6]|(b[7]<<8))
+
+def convert(dev,rgbc,lux,cct=None):
+    """Converts a buffer of RGBC samples, see :meth:`.ALS.convert`"""
+    k,shift=_scale(dev)
+    for i in range(len(rgbc)>>2):
+        j=i<<2
+        c=rgbc[j]
+        r=rgbc[j+1]
+        g=rgbc[j+2]
+        b=rgbc[j+3]
+        lux[i]=_lux(c,r,g,b,k,shift)
+        if cct is not None:
+            cct[i]=_cct(c,r,g,b)
+
+def readNormalized(dev,autoRange,buf):
+    """Reads the RGBC channels normalised to 64x gain and 36 cycles, see :meth:`.ALS.readNormalized`
+
+    :param autoRange: The auto-range state or None
+    :type autoRange: AutoRange
+    """
+    if autoRange is None:
+        g=dev._readByte(0x8f) & 0x03
+        cycles=(256-dev._readByte(0x81)) or 256
+        b=dev._scratch
+        dev._readInto(0x94,b)          #CDATAL, CDATAH, RDATAL .. BDATAH
+        i=0
+    else:
+        b=autoRange.status
+        dev._readInto(0x93,b)          #STATUS, CDATAL, CDATAH, RDATAL .. BDATAH
+        if autoRange.pending:
+            if not b[0] & 0x01:        #AVALID, data from the previous range
+                return None
+            autoRange.pending=False
+        g,cycles=autoRange.levels[autoRange.level]
+        i=1
+    mult=(64>>(2*g))*36                 # to 64x gain and 36 cycles
+    c=b[i]|(b[i+1]<<8)
+    if buf is None:
+        buf=(c*mult//cycles, (b[i+2]|(b[i+3]<<8))*mult//cycles,
+             (b[i+4]|(b[i+5]<<8))*mult//cycles, (b[i+6]|(b[i+7]<<8))*mult//cycles)
+    else:
+        buf[0]=c*mult//cycles
+        buf[1]=(b[i+2]|(b[i+3]<<8))*mult//cycles
+        buf[2]=(b[i+4]|(b[i+5]<<8))*mult//cycles
+        buf[3]=(b[i+6]|(b[i+7]<<8))*mult//cycles
+    if autoRange is not None:
+        sat=min(65535,1025*cycles)
+        level=autoRange.level
+        if (c>=sat*9//10 or b[0] & 0x80) and level>0:   # Near saturation or CPSAT
+            autoRange.setLevel(level-1)
+        elif c<sat//10 and level<len(autoRange.levels)-1:
+            autoRange.setLevel(level+1)
+    return buf
+
+
+class AutoRange:
+    """Auto-range state of :meth:`.ALS.readNormalized`: the (gain, integration cycles) steps
+    around the current gain and integration time, see :meth:`.ALS.enableAutoRange`
+
+    :param dev: The device core
+    :type dev: I2CEX
+    """
+    def __init__(self,dev):
+        self._dev=dev
+        cycles=(256-dev._readByte(0x81)) or 256   # ATIME=256-cycles
+        gain=dev._readByte(0x8f) & 0x03           # AGAIN
+        levels=[]
+        for c in (cycles>>4,cycles>>2):           # Bright light: shorter integration at 1x
+            if c:
+                levels.append((0,c))
+        for g in range(4):                        # 1x, 4x, 16x, 64x
+            levels.append((g,cycles))
+        for c in (cycles<<2,cycles<<4):           # Dim light: longer integration at 64x
+            c=min(256,c)
+            if levels[-1][1]!=c:
+                levels.append((3,c))
+        self.levels=levels
+        self.level=levels.index((gain,cycles))
+        self.status=bytearray(9)                  # STATUS + RGBC burst buffer
+        self.pending=False                        # Range changed, waiting for a new light cycle
+
+    def setLevel(self,level):
+        """Writes the gain and integration time of an auto-range step.
+        AEN is cleared during the change so the light cycle in progress is discarded"""
+        dev=self._dev
+        g,cycles=self.levels[level]
+        oldG,oldCycles=self.levels[self.level]
+        en=dev._readByte(0x80)
+        dev._writeByte(0x80,en & ~0x02)          # AEN off
+        if g!=oldG:
+            dev._regUpdate(0x8f,0x03,g)          # AGAIN
+        if cycles!=oldCycles:
+            dev._writeByte(0x81,(256-cycles) & 0xff)  # ATIME
+        dev._writeByte(0x80,en)                  # AEN on, starts a light cycle with the new range
+        self.level=level
+        self.pending=True
@@ -0,0 +1,131 @@
+"""`poller`
+====================================================
+
+Polling without the INT pin: the time the next sample is ready is computed from the sensor
+configuration (:attr:`.APDS9960LITE.sampleRate`) and the status register is only checked
+around that time. Each new sample (AVALID / PVALID) is read exactly once.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+
+:example:
+  .. code:: python
+
+    from uPy_APDS9960.apds9960LITE import APDS9960LITE, CHANNEL_PROX
+    from uPy_APDS9960.poller import AdaptivePoller
+
+    apds9960=APDS9960LITE(i2c)
+    apds9960.prox.enableSensor()
+    poller=AdaptivePoller(apds9960, CHANNEL_PROX)
+    while True:
+        print(poller.read())        # Sleeps until the next sample is ready
+"""
+from array import array
+from uPy_APDS9960.apds9960LITE import CHANNEL_PROX, CHANNEL_ALS, CHANNEL_RGBC, ticks_us, ticks_diff, ticks_add, sleep_ms
+
+class AdaptivePoller:
+    """Reads new samples at the rate the sensor produces them.
+
+    The status register is first checked margin_ms before the expected ready time,
+    if the sample is not ready it is checked again every 1/8 period.
+    The expected ready time follows the time the samples are seen, so the checks stay
+    aligned with the sensor cycle. Call :meth:`refresh` after changing the timing configuration.
+
+    :param dev: The sensor driver (APDS9960LITE or APDS9900LITE)
+    :type dev: APDS9960LITE
+
+    :param channel: CHANNEL_PROX, CHANNEL_ALS or CHANNEL_RGBC (Default CHANNEL_PROX)
+    :type channel: int
+
+    :param margin_ms: How early the status is checked before the expected ready time (Default 1)
+    :type margin_ms: int
+    """
+    def __init__(self,dev,channel=CHANNEL_PROX,margin_ms=1):
+        self.__dev=dev
+        self.__channel=channel
+        self.__valid=0x02 if channel==CHANNEL_PROX else 0x01   # PVALID / AVALID
+        self.__margin=margin_ms*1000
+        self.__rgbc=array('H',(0,0,0,0))
+        self.checks=0
+        """Number of status register reads"""
+        self.samples=0
+        """Number of samples read"""
+        self.refresh()
+
+    def refresh(self):
+        """Recomputes the sample period from the sensor configuration, the next sample is checked at once"""
+        rate=self.__dev.sampleRate
+        self.period=int(1000000/rate) if rate else 0
+        """Sample period in us (0 when the engine is off)"""
+        self.__step=max(1000,self.period>>3) if self.period else 10000
+        self.__next=ticks_us()
+        self.__first=True         # The next status check is the first for this sample
+
+    def wait(self):
+        """Returns the time until the status should be checked
+
+        :returns: ms until :meth:`poll` reads the status register, 0 when due
+        :rtype: int
+        """
+        return max(0,(ticks_diff(self.__next,ticks_us())+999)//1000)
+
+    def poll(self):
+        """Non blocking read, the status register is only read when a sample is due
+
+        :returns: The new sample (proximity, clear level or the RGBC array reused for each sample),
+                  None when no new sample is ready
+        :rtype: int
+        """
+        now=ticks_us()
+        expected=self.__next
+        if ticks_diff(expected,now)>0:
+            return None
+        self.checks+=1
+        if not self.__dev.statusRegister & self.__valid:
+            self.__first=False
+            self.__next=ticks_add(now,self.__step)
+            return None
+        if self.__first and ticks_diff(now,expected)<self.period:
+            ready=ticks_add(expected,self.__margin)   # Ready before the check, keep the estimate
+        else:
+            ready=now                                 # Seen while checking (or late), resync
+        self.__next=ticks_add(ready,self.period-self.__margin)
+        self.__first=True
+        self.samples+=1
+        return self.__read()
+
+    def __read(self):
+        dev=self.__dev
+        if self.__channel==CHANNEL_PROX:
+            return dev.prox.proximityLevel
+        if self.__channel==CHANNEL_RGBC:
+            return dev.als.readRGBC(self.__rgbc)
+        return dev.als.ambientLightLevel
+
+    def read(self):
+        """Sleeps until the next sample is ready and reads it
+
+        :returns: The new sample, see :meth:`poll`
+        :rtype: int
+        """
+        while True:
+            value=self.poll()
+            if value is not None:
+                return value
+            sleep_ms(max(1,self.wait()))
+
+    async def readAsync(self):
+        """Same as :meth:`read`, other uasyncio tasks run while waiting
+
+        :returns: The new sample, see :meth:`poll`
+        :rtype: int
+        """
+        try:
+            import uasyncio as asyncio
+        except ImportError:
+            import asyncio
+        while True:
+            value=self.poll()
+            if value is not None:
+                return value
+            await asyncio.sleep(max(1,self.wait())/1000)
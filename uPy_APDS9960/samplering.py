@@ -0,0 +1,95 @@
+"""`samplering`
+====================================================
+
+Preallocated ring buffer of timestamped samples used by :meth:`.APDS9960LITE.attachInterrupt`,
+the streams and the events, loaded on first use.
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+from array import array
+
+class SampleRing:
+    """Preallocated ring buffer of timestamped samples.
+    When the buffer is full the oldest sample is overwritten (counted in :attr:`dropped`).
+
+    :param size: Number of samples the buffer holds (Default 16)
+    :type size: int
+
+    :param width: Number of values per sample, 1 or 4 for RGBC samples (Default 1)
+    :type width: int
+    """
+    def __init__(self,
+                 size=16,
+                 width=1):
+        self.__ticks=array('L',[0]*size)       # Sample time (ticks_us)
+        self.__value=array('H',[0]*(size*width)) # Sample values
+        self.__chan=bytearray(size)            # CHANNEL_PROX / CHANNEL_ALS / CHANNEL_RGBC
+        self.__width=width
+        self.__size=size
+        self.__head=0      # Next slot to write
+        self.__count=0
+        self.dropped=0
+
+    dropped = 0
+    """Number of samples overwritten before they were read"""
+
+    def __len__(self):
+        return self.__count
+
+    def clear(self):
+        """Removes all samples"""
+        self.__count=0
+
+    def push(self,ticks,channel,value,v1=0,v2=0,v3=0):
+        """Adds a sample (does not allocate memory)
+
+        :param ticks: Sample time (time.ticks_us())
+        :type ticks: int
+
+        :param channel: CHANNEL_PROX, CHANNEL_ALS or CHANNEL_RGBC
+        :type channel: int
+
+        :param value: The sample value (0 - 65535)
+        :type value: int
+
+        :param v1: Second to fourth value stored when width is 4 (ex. red, green, blue)
+        :type v1: int
+        """
+        i=self.__head
+        self.__ticks[i]=ticks
+        self.__chan[i]=channel
+        if self.__width==1:
+            self.__value[i]=value
+        else:
+            j=i*4
+            v=self.__value
+            v[j]=value
+            v[j+1]=v1
+            v[j+2]=v2
+            v[j+3]=v3
+        i+=1
+        self.__head=0 if i==self.__size else i
+        if self.__count==self.__size:
+            self.dropped+=1
+        else:
+            self.__count+=1
+
+    def pop(self):
+        """Removes and returns the oldest sample
+
+        :returns: (ticks, channel, value) or (ticks, channel, clear, red, green, blue) 
+                  for width 4 or None when empty
+        :rtype: tuple
+        """
+        if self.__count==0:
+            return None
+        i=self.__head-self.__count
+        if i<0:
+            i+=self.__size
+        self.__count-=1
+        if self.__width==1:
+            return (self.__ticks[i],self.__chan[i],self.__value[i])
+        v=self.__value
+        j=i*4
+        return (self.__ticks[i],self.__chan[i],v[j],v[j+1],v[j+2],v[j+3])
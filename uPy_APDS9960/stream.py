@@ -0,0 +1,100 @@
+"""`stream`
+====================================================
+
+uasyncio streams of APDS9960 samples, see :meth:`.PROX.stream` and :meth:`.ALS.stream`
+
+    Licence GNU General Public License v3.0
+    https://www.gnu.org/licenses/gpl-3.0.html
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+from uPy_APDS9960.apds9960LITE import CHANNEL_PROX, CHANNEL_RGBC, ticks_us
+from uPy_APDS9960.samplering import SampleRing
+
+class SampleStream:
+    """Async iterator of timestamped samples.
+    A producer task checks the sensor rate_hz times per second and reads each new sample once 
+    into a bounded :class:`.SampleRing`, the oldest samples are dropped if the consumer is too slow.
+    The producer task is started by the first ``async for`` and runs until :meth:`close`.
+
+    :param dev: The device core 
+    :type dev: I2CEX
+
+    :param channel: CHANNEL_PROX, CHANNEL_ALS or CHANNEL_RGBC
+    :type channel: int
+
+    :param rate_hz: How often the sensor is checked for a new sample (Default 10)
+    :type rate_hz: int
+
+    :param size: Number of samples queued (Default 8)
+    :type size: int
+
+    :param pin: Optional pin connected to INT, used instead of the status register (Default None)
+    :type pin: machine.Pin
+    """
+    def __init__(self,dev,channel,rate_hz=10,size=8,pin=None):
+        self.__dev=dev
+        self.__channel=channel
+        self.__delay=1/rate_hz
+        self.__ring=SampleRing(size,4 if channel==CHANNEL_RGBC else 1)
+        self.__pin=pin
+        self.__event=asyncio.Event()
+        self.__task=None
+
+    @property
+    def dropped(self):
+        """Number of samples dropped because the consumer was too slow
+
+            :getter: Returns the number of dropped samples
+            :type: int     
+        """
+        return self.__ring.dropped
+
+    def __aiter__(self):
+        if self.__task is None:
+            self.__task=asyncio.create_task(self.__produce())
+        return self
+
+    async def __anext__(self):
+        ring=self.__ring
+        while not len(ring):
+            self.__event.clear()
+            await self.__event.wait()
+        return ring.pop()
+
+    def close(self):
+        """Stops the producer task"""
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task=None
+
+    def __ready(self):
+        """Returns True when a new sample is available"""
+        if self.__pin is not None:
+            return self.__pin.value()==0
+        VALID=0x02 if self.__channel==CHANNEL_PROX else 0x01   # PVALID / AVALID
+        return self.__dev._readByte(0x93) & VALID              # Status register
+
+    def __read(self,ticks):
+        """Reads the sample (clears PVALID / AVALID) and queues it"""
+        dev=self.__dev
+        channel=self.__channel
+        if channel==CHANNEL_PROX:
+            self.__ring.push(ticks,channel,dev._readProximity())  # PDATA
+        elif channel==CHANNEL_RGBC:
+            b=dev._scratch
+            dev._readInto(0x94,b)                                 # CDATAL .. BDATAH
+            self.__ring.push(ticks,channel,b[0]|(b[1]<<8),b[2]|(b[3]<<8),b[4]|(b[5]<<8),b[6]|(b[7]<<8))
+        else:
+            self.__ring.push(ticks,channel,dev._read2Byte(0x94))  # CDATAL and CDATAH
+        if self.__pin is not None:
+            dev._special(0xE7)        # APDS9960_AICLEAR clear all non-gesture interrupts
+        self.__event.set()
+
+    async def __produce(self):
+        while True:
+            await asyncio.sleep(self.__delay)
+            if self.__ready():
+                self.__read(ticks_us())